@@ -1,4 +1,18 @@
+from . import controllers
 from . import models
+from . import wizard
+
+
+def post_init_hook(env):
+    """
+    Start filling the financial figures in the background.
+
+    The columns are created empty on install (see project.project._auto_init),
+    the backfill computes them in chunks without blocking the installation.
+    """
+    cron = env.ref('project_statistic.ir_cron_backfill_financial_data', raise_if_not_found=False)
+    if cron:
+        cron._trigger()
 
 
 def uninstall_hook(env):
@@ -7,51 +21,89 @@ def uninstall_hook(env):
 
     This ensures:
     1. Orphaned database columns are removed
-    2. View inheritances are properly cleaned up
-    3. Standard project form continues to work after uninstallation
+    2. Module indexes on shared tables and module side tables are removed
+    3. View inheritances are properly cleaned up
+    4. Standard project form continues to work after uninstallation
+
+    All module columns of project_project are dropped with a single ALTER TABLE
+    statement, so the table is locked (ACCESS EXCLUSIVE) once instead of once per
+    column. Everything runs in one savepoint: if it fails, nothing is dropped here
+    and Odoo's regular uninstall removes the columns instead.
     """
     import logging
+    import time
     _logger = logging.getLogger(__name__)
 
-    # 1. Remove computed stored fields from database
-    fields_to_remove = [
-        'customer_invoiced_amount',
-        'customer_paid_amount',
-        'customer_outstanding_amount',
-        'customer_skonto_taken',
-        'vendor_bills_total',
-        'vendor_skonto_received',
-        'total_costs_net',
-        'total_costs_with_tax',
-        'profit_loss',
-        'negative_difference',
-        'total_hours_booked',
-        'labor_costs',
-        'client_name',
-        'head_of_project'
-    ]
+    cr = env.cr
+    start = time.perf_counter()
+
+    # 1. Stored fields this module added to project.project that still have a column
+    cr.execute("""
+        SELECT field.name
+          FROM ir_model_fields field
+          JOIN ir_model_data data ON data.model = 'ir.model.fields' AND data.res_id = field.id
+          JOIN information_schema.columns col
+            ON col.table_name = 'project_project' AND col.column_name = field.name
+         WHERE data.module = 'project_statistic'
+           AND field.model = 'project.project'
+           AND field.store
+      ORDER BY field.name
+    """)
+    columns = [row[0] for row in cr.fetchall()]
+
+    # 2. Indexes this module created on tables of other modules
+    #    (indexes on the dropped columns are removed together with them)
+    cr.execute("""
+        SELECT indexname FROM pg_indexes
+         WHERE indexname IN ('account_analytic_line_account_id_date_index')
+    """)
+    indexes = [row[0] for row in cr.fetchall()]
+
+    # Side tables of the module's own models (SQL views are left to the ORM)
+    cr.execute("""
+        SELECT tab.table_name
+          FROM ir_model model
+          JOIN ir_model_data data ON data.model = 'ir.model' AND data.res_id = model.id
+          JOIN information_schema.tables tab
+            ON tab.table_schema = current_schema()
+           AND tab.table_name = replace(model.model, '.', '_')
+           AND tab.table_type = 'BASE TABLE'
+         WHERE data.module = 'project_statistic'
+      ORDER BY tab.table_name
+    """)
+    tables = [row[0] for row in cr.fetchall()]
 
-    # Drop each column individually using safe identifier quoting
     try:
         from psycopg2 import sql
-        for field in fields_to_remove:
-            try:
-                # Use sql.Identifier to safely quote column names
-                query = sql.SQL("ALTER TABLE project_project DROP COLUMN IF EXISTS {}").format(
-                    sql.Identifier(field)
-                )
-                env.cr.execute(query)
-            except Exception as field_error:
-                _logger.warning(f"Could not drop column {field}: {field_error}")
-        _logger.info("Successfully removed project_statistic database columns")
+        with cr.savepoint():
+            if columns:
+                cr.execute(sql.SQL("ALTER TABLE project_project {}").format(
+                    sql.SQL(", ").join(
+                        sql.SQL("DROP COLUMN IF EXISTS {}").format(sql.Identifier(column))
+                        for column in columns
+                    )
+                ))
+            if indexes:
+                cr.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(
+                    sql.SQL(", ").join(sql.Identifier(index) for index in indexes)
+                ))
+            if tables:
+                cr.execute(sql.SQL("DROP TABLE IF EXISTS {} CASCADE").format(
+                    sql.SQL(", ").join(sql.Identifier(table) for table in tables)
+                ))
+        _logger.info(
+            f"Removed project_statistic database objects in {(time.perf_counter() - start) * 1000:.0f} ms: "
+            f"{len(columns)} column(s) of project_project ({', '.join(columns) or '-'}), "
+            f"index(es) {', '.join(indexes) or '-'}, table(s) {', '.join(tables) or '-'}"
+        )
     except Exception as e:
-        _logger.warning(f"Error during database cleanup: {e}")
+        _logger.warning(f"Error during database cleanup, leaving it to the regular uninstall: {e}")
 
-    # 2. Remove view inheritance (Odoo will handle this automatically via cascade delete)
+    # 3. Remove view inheritance (Odoo will handle this automatically via cascade delete)
     # The view inheritance record will be deleted when the module is uninstalled
     # No manual cleanup needed - Odoo's ORM handles this
 
-    # 3. Verify standard project form still works
+    # 4. Verify standard project form still works
     try:
         # Check if standard project form view exists and is accessible
         standard_form = env.ref('project.edit_project', raise_if_not_found=False)
@@ -62,4 +114,4 @@ def uninstall_hook(env):
     except Exception as e:
         _logger.warning(f"Error verifying standard project form: {e}")
 
-    env.cr.commit()
\ No newline at end of file
+    env.cr.commit()
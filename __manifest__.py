@@ -1,6 +1,6 @@
 {
     'name': 'Project Statistic',
-    'version': '18.0.1.0.1',
+    'version': '18.0.1.1.0',
     'category': 'Project',
     'summary': 'Enhanced project analytics with financial data',
     'description': """
@@ -19,16 +19,31 @@
         'accountant', 
         'analytic',
         'hr_timesheet',
+        'bus',
     ],
     'author': 'Alex Feld',
     'license': 'LGPL-3',
     'data': [
         'security/ir.model.access.csv',
+        'security/project_analytics_security.xml',
+        'wizard/project_analytics_period_wizard_views.xml',
+        'wizard/project_analytics_export_wizard_views.xml',
         'views/project_analytics_views.xml',
+        'views/project_analytics_period_views.xml',
+        'views/project_analytics_rollup_views.xml',
+        'views/project_analytics_cost_rate_views.xml',
+        'views/project_analytics_ledger_views.xml',
         'data/menuitem.xml',
+        'data/ir_cron.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'project_statistic/static/src/views/**/*',
+        ],
+    },
     'installable': True,
     'application': False,
     'auto_install': False,
+    'post_init_hook': 'post_init_hook',
     'uninstall_hook': 'uninstall_hook',
 }
\ No newline at end of file
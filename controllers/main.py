@@ -0,0 +1,60 @@
+from odoo import http
+from odoo.http import request, content_disposition
+import json
+
+BI_PAGE_SIZE = 500
+BI_MAX_PAGE_SIZE = 5000
+
+
+class ProjectStatisticController(http.Controller):
+
+    @http.route('/project_statistic/export/<int:wizard_id>', type='http', auth='user')
+    def export_financial_data(self, wizard_id, **kwargs):
+        """
+        Stream the project statistics export configured in the export wizard.
+        The file is generated chunk by chunk while it is sent.
+        """
+        wizard = request.env['project.analytics.export.wizard'].browse(wizard_id).exists()
+        if not wizard:
+            raise request.not_found()
+        wizard.check_access('read')
+
+        response = request.make_response(wizard._stream_export(), headers=[
+            ('Content-Type', wizard._get_export_content_type()),
+            ('Content-Disposition', content_disposition(wizard._get_export_filename())),
+        ])
+        response.direct_passthrough = True
+        return response
+
+    @http.route('/project_statistic/api/projects', type='http', auth='bearer', methods=['GET'])
+    def bi_projects(self, after_id=0, limit=BI_PAGE_SIZE, **kwargs):
+        """
+        Paginated JSON feed of the project figures for BI tools.
+
+        Pollers authenticate with an API key (Authorization: Bearer <key>),
+        a logged-in session is accepted as well.
+
+        Query parameters:
+        - after_id: keyset cursor, return projects with a greater id (default 0)
+        - limit: page size (default 500, at most 5000)
+
+        Answers 304 Not Modified when the ETag sent in If-None-Match still
+        matches, i.e. no figure changed since the last poll.
+        """
+        try:
+            after_id = int(after_id)
+            limit = min(max(int(limit), 1), BI_MAX_PAGE_SIZE)
+        except ValueError:
+            return request.make_json_response({'error': 'after_id and limit must be integers'}, status=400)
+
+        Project = request.env['project.project']
+        etag = Project._get_bi_etag(after_id, limit)
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', 'private, no-cache')]
+        if etag in request.httprequest.if_none_match:
+            return request.make_response('', headers=headers, status=304)
+
+        page = Project._get_bi_page(after_id, limit)
+        return request.make_response(
+            json.dumps(page, default=str),
+            headers=headers + [('Content-Type', 'application/json')],
+        )
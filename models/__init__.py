@@ -1,2 +1,14 @@
 from . import project_analytics
-from . import account_move_line
\ No newline at end of file
+from . import project_analytics_period
+from . import project_analytics_aggregate
+from . import project_analytics_aggregate_delta
+from . import project_analytics_rollup
+from . import project_analytics_summary
+from . import project_analytics_cost_rate
+from . import project_analytics_ledger
+from . import account_move_line
+from . import account_move
+from . import account_analytic_line
+from . import account_partial_reconcile
+from . import res_company
+from . import ir_websocket
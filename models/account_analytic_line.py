@@ -0,0 +1,51 @@
+from odoo import models, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountAnalyticLine(models.Model):
+    _inherit = 'account.analytic.line'
+
+    def init(self):
+        # Period figures filter analytic lines by account and date
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_analytic_line_account_id_date_index
+            ON account_analytic_line (account_id, date)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self._invalidate_project_analytics_periods(lines)
+        if lines.account_id:
+            self.env['project.project']._thaw_financial_data(lines.account_id.ids)
+        return lines
+
+    def write(self, vals):
+        if any(key in vals for key in ['account_id', 'amount', 'unit_amount', 'date', 'move_line_id', 'project_id']):
+            # Figures of both the old and the new period/account are affected
+            self._invalidate_project_analytics_periods(self)
+            result = super().write(vals)
+            self._invalidate_project_analytics_periods(self)
+            return result
+        return super().write(vals)
+
+    def unlink(self):
+        self._invalidate_project_analytics_periods(self)
+        return super().unlink()
+
+    def _invalidate_project_analytics_periods(self, lines):
+        """
+        Drop cached period figures of the projects booked on these lines.
+        """
+        lines = lines.filtered('account_id')
+        if not lines:
+            return
+
+        projects = self.env['project.project']._get_projects_for_analytic_accounts(lines.account_id.ids)
+        if projects:
+            dates = [date for date in lines.mapped('date') if date]
+            self.env['project.analytics.period']._invalidate_periods(
+                projects, min(dates) if dates else False, max(dates) if dates else False,
+            )
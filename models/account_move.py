@@ -0,0 +1,24 @@
+from odoo import models
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _post(self, soft=True):
+        # Posting changes the state only, which the move line hooks do not see
+        posted = super()._post(soft=soft)
+        self.env['account.move.line']._trigger_project_analytics_recompute(posted.line_ids)
+        return posted
+
+    def button_draft(self):
+        result = super().button_draft()
+        self.env['account.move.line']._trigger_project_analytics_recompute(self.line_ids)
+        return result
+
+    def button_cancel(self):
+        result = super().button_cancel()
+        self.env['account.move.line']._trigger_project_analytics_recompute(self.line_ids)
+        return result
@@ -27,39 +27,55 @@ class AccountMoveLine(models.Model):
         """
         Trigger recomputation of project analytics when move lines with analytic distribution change.
         """
-        if not lines:
-            return
+        projects = self._get_project_analytics_projects(lines)
+        if projects:
+            # Frozen projects are thawed as soon as their lines change, also when
+            # whoever changes them is not allowed to write the project
+            frozen_projects = projects.sudo().filtered('financial_frozen')
+            if frozen_projects:
+                frozen_projects.write({'financial_frozen': False})
+            # Cached figures of closed periods containing these lines are stale now
+            dates = [date for date in lines.mapped('date') if date]
+            self.env['project.analytics.period']._invalidate_periods(
+                projects, min(dates) if dates else False, max(dates) if dates else False,
+            )
+            projects._compute_financial_data()
+            _logger.info(f"Recomputed financial data for {len(projects)} project(s)")
 
-        project_ids = set()
+    @api.model
+    def _get_project_analytics_projects(self, lines):
+        """
+        Find the projects of the analytic accounts (projects plan) in the
+        distributions of the lines.
+        """
+        if not lines:
+            return self.env['project.project']
 
+        # Collect the analytic accounts of all lines first, then resolve them
+        # to projects with a fixed number of queries
+        analytic_account_ids = set()
         for line in lines:
             if not line.analytic_distribution:
                 continue
 
-            try:
-                project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
-                if not project_plan:
+            for analytic_account_id_str in line.analytic_distribution.keys():
+                try:
+                    analytic_account_ids.add(int(analytic_account_id_str))
+                except (ValueError, TypeError):
                     continue
 
-                for analytic_account_id_str in line.analytic_distribution.keys():
-                    try:
-                        analytic_account_id = int(analytic_account_id_str)
-                        analytic_account = self.env['account.analytic.account'].browse(analytic_account_id)
+        if not analytic_account_ids:
+            return self.env['project.project']
 
-                        if analytic_account.exists() and analytic_account.plan_id == project_plan:
-                            projects = self.env['project.project'].search([
-                                '|',
-                                ('analytic_account_id', '=', analytic_account.id),
-                                ('account_id', '=', analytic_account.id)
-                            ])
-                            project_ids.update(projects.ids)
-                    except (ValueError, TypeError):
-                        continue
-            except Exception as e:
-                _logger.warning(f"Error finding projects for analytic distribution: {e}")
-                continue
+        project_ids = set()
+        try:
+            project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
+            if project_plan:
+                analytic_accounts = self.env['account.analytic.account'].browse(analytic_account_ids).exists()
+                analytic_accounts = analytic_accounts.filtered(lambda account: account.plan_id == project_plan)
+                projects = self.env['project.project']._get_projects_for_analytic_accounts(analytic_accounts.ids)
+                project_ids.update(projects.ids)
+        except Exception as e:
+            _logger.warning(f"Error finding projects for analytic distribution: {e}")
 
-        if project_ids:
-            projects = self.env['project.project'].browse(list(project_ids))
-            projects._compute_financial_data()
-            _logger.info(f"Recomputed financial data for {len(projects)} project(s)")
+        return self.env['project.project'].browse(list(project_ids))
@@ -0,0 +1,31 @@
+from odoo import models, api
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        self._invalidate_project_analytics_periods(partials)
+        return partials
+
+    def unlink(self):
+        self._invalidate_project_analytics_periods(self)
+        return super().unlink()
+
+    def _invalidate_project_analytics_periods(self, partials):
+        """
+        Drop cached period figures of the projects of reconciled customer invoices.
+        The paid amounts of the periods ending on or after the reconciliation change.
+        """
+        invoices = (partials.debit_move_id | partials.credit_move_id).move_id.filtered(
+            lambda move: move.move_type in ('out_invoice', 'out_refund')
+        )
+        if not invoices:
+            return
+
+        projects = self.env['account.move.line']._get_project_analytics_projects(invoices.invoice_line_ids)
+        if projects:
+            dates = [date for date in partials.mapped('max_date') if date]
+            self.env['project.analytics.period']._invalidate_periods(projects, min(dates) if dates else False)
@@ -0,0 +1,12 @@
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Project users listen to the live updates of the companies they may access."""
+        channels = super()._build_bus_channel_list(channels)
+        if self.env.user._is_internal() and self.env.user.has_group('project.group_project_user'):
+            channels.extend(self.env.user.company_ids)
+        return channels
@@ -1,9 +1,30 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, sql_db, _
+from odoo.api import Transaction
+from odoo.osv import expression
+from odoo.tools import SQL, config, float_is_zero, str2bool
+from odoo.tools.sql import column_exists, create_column
+from collections import defaultdict
+from contextlib import contextmanager
+import hashlib
 import logging
 import json
+import time
+
+from .project_analytics_summary import SUMMARY_PRESET_DOMAINS
 
 _logger = logging.getLogger(__name__)
 
+# Number of lines loaded into the cache at once while scanning a project's history
+FINANCIAL_LINE_CHUNK_SIZE = 2000
+
+# Number of projects recomputed per transaction by the backfill
+FINANCIAL_BACKFILL_CHUNK_SIZE = 500
+# Seconds a backfill run may take before it hands over to the next run
+FINANCIAL_BACKFILL_TIME_LIMIT = 300
+
+# Bus notification type of the live updates of open dashboards
+FINANCIAL_BUS_NOTIFICATION = 'project_statistic/updated'
+
 
 class ProjectAnalytics(models.Model):
     _inherit = 'project.project'
@@ -120,6 +141,60 @@ class ProjectAnalytics(models.Model):
         help="Total cost of labor based on timesheets (Personalkosten). Calculated from timesheet entries multiplied by employee hourly rates. This is a major component of internal project costs."
     )
 
+    financial_data_computed_at = fields.Datetime(
+        string='Last Computed At',
+        compute='_compute_financial_data',
+        store=True,
+        index=True,
+        help="When the financial figures of this project were last recomputed."
+    )
+    financial_frozen = fields.Boolean(
+        string='Figures Frozen',
+        readonly=True,
+        copy=False,
+        index=True,
+        help="The project is in a closed stage and has no open invoices or bills. Its stored figures are kept as they are "
+             "and it is skipped by bulk recomputes. It is thawed automatically when a new line is booked on its analytic account."
+    )
+
+    def _auto_init(self):
+        """
+        Create the columns of the stored financial fields before the ORM does.
+
+        When the ORM creates the column of a stored computed field, it computes the
+        field for every project within the install/upgrade transaction, which takes
+        hours and holds locks on large databases. Columns that already exist are left
+        alone: the financial figures are filled afterwards by the chunked backfill
+        (_cron_backfill_financial_data), client_name and head_of_project with one
+        UPDATE each.
+        """
+        cr = self.env.cr
+        column_types = dict.fromkeys(self._get_financial_field_names(), 'double precision')
+        column_types['financial_data_computed_at'] = 'timestamp'
+        for name, column_type in column_types.items():
+            if not column_exists(cr, self._table, name):
+                create_column(cr, self._table, name, column_type)
+
+        if not column_exists(cr, self._table, 'client_name'):
+            create_column(cr, self._table, 'client_name', 'varchar')
+            cr.execute("""
+                UPDATE project_project project
+                   SET client_name = partner.name
+                  FROM res_partner partner
+                 WHERE partner.id = project.partner_id
+            """)
+        if not column_exists(cr, self._table, 'head_of_project'):
+            create_column(cr, self._table, 'head_of_project', 'varchar')
+            cr.execute("""
+                UPDATE project_project project
+                   SET head_of_project = partner.name
+                  FROM res_users users
+                  JOIN res_partner partner ON partner.id = users.partner_id
+                 WHERE users.id = project.user_id
+            """)
+
+        return super()._auto_init()
+
     @api.depends('partner_id', 'user_id')
     def _compute_financial_data(self):
         """
@@ -131,30 +206,267 @@ class ProjectAnalytics(models.Model):
         Note: We depend on partner_id and user_id (guaranteed core fields) rather than
         account_id or sale_line_id which may not exist if certain modules aren't installed.
         The actual financial data is computed from account.analytic.line records.
+
+        The stored fields always hold lifetime totals, so the period taken from the
+        context (see _get_financial_period) is explicitly ignored here.
         """
+        self._snapshot_financial_state()
+        figures = self._compute_financial_figures(date_from=False, date_to=False)
+        now = fields.Datetime.now()
         for project in self:
-            # Initialize all fields
-            customer_invoiced_amount = 0.0
-            customer_paid_amount = 0.0
-            customer_outstanding_amount = 0.0
-            vendor_bills_total = 0.0
-            customer_skonto_taken = 0.0
-            vendor_skonto_received = 0.0
-            total_costs_net = 0.0
-            total_costs_with_tax = 0.0
-            profit_loss = 0.0
-            negative_difference = 0.0
-            total_hours_booked = 0.0
-            labor_costs = 0.0
-
-            # Get the analytic account associated with the project (projects plan ONLY)
-            analytic_account = None
+            project.update(figures[project.id])
+            project.financial_data_computed_at = now
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        projects = super().create(vals_list)
+        projects._snapshot_financial_state(new=True)
+        return projects
+
+    def write(self, vals):
+        if any(key in vals for key in self._get_financial_state_field_names()):
+            self._snapshot_financial_state()
+        result = super().write(vals)
+        if 'stage_id' in vals:
+            self._update_financial_frozen()
+        return result
+
+    def unlink(self):
+        self._snapshot_financial_state()
+        return super().unlink()
+
+    @api.model
+    def _get_financial_state_field_names(self):
+        """Fields that decide how a project contributes to the aggregated figures and when it was last computed."""
+        return [
+            'active', 'company_id', 'partner_id', 'user_id', 'financial_frozen', 'financial_data_computed_at',
+        ] + self._get_financial_field_names()
+
+    @api.model
+    def _read_financial_state(self, project_ids):
+        """
+        Read the aggregation relevant state of projects as stored in the database.
+
+        Returns:
+            dict: {project_id: {field_name: value}}, projects that do not exist are missing
+        """
+        if not project_ids:
+            return {}
+        field_names = self._get_financial_state_field_names()
+        self.env.cr.execute(SQL(
+            "SELECT id, %s FROM project_project WHERE id = ANY(%s)",
+            SQL(', ').join(SQL.identifier(name) for name in field_names),
+            list(project_ids),
+        ))
+        return {row.pop('id'): row for row in self.env.cr.dictfetchall()}
+
+    def _snapshot_financial_state(self, new=False):
+        """
+        Remember the state of the projects before they change in this transaction.
 
-            # Get the standard project analytic plan reference
-            try:
-                project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
-            except Exception:
-                project_plan = None
+        Only the first snapshot of a project per transaction is kept. Before the
+        commit, _apply_financial_changes compares it with the final state and
+        propagates the differences to the aggregated figures.
+
+        Args:
+            new: the projects were just created and had no state before
+        """
+        data = self.env.cr.precommit.data
+        snapshots = data.get('project_statistic.snapshots')
+        if snapshots is None:
+            snapshots = data['project_statistic.snapshots'] = {}
+            self.env.cr.precommit.add(self.env['project.project']._apply_financial_changes)
+
+        project_ids = [project_id for project_id in self.ids if isinstance(project_id, int) and project_id not in snapshots]
+        if new:
+            snapshots.update(dict.fromkeys(project_ids))
+        elif project_ids:
+            states = self._read_financial_state(project_ids)
+            for project_id in project_ids:
+                snapshots[project_id] = states.get(project_id)
+
+    @api.model
+    def _apply_financial_changes(self):
+        """
+        Precommit hook: propagate the changes of this transaction to the aggregated figures.
+        Runs after the final flush, so the database holds the final state of every project.
+        """
+        snapshots = self.env.cr.precommit.data.pop('project_statistic.snapshots', {})
+        if not snapshots:
+            return
+        states = self._read_financial_state(list(snapshots))
+        changes = {
+            project_id: (old_state, states.get(project_id))
+            for project_id, old_state in snapshots.items()
+            if old_state != states.get(project_id)
+        }
+        if changes:
+            self.env['project.analytics.rollup']._apply_project_changes(changes)
+            self.env['project.analytics.summary']._apply_project_changes(changes)
+            self._notify_financial_changes(changes)
+
+    @api.model
+    def _notify_financial_changes(self, changes):
+        """
+        Tell open dashboards that the stored figures of projects changed.
+
+        Called once per transaction with all changed projects, so a recompute of
+        many projects results in a single bus notification per company. It is
+        sent on the company, whose channel only its users listen to (see
+        ir.websocket); projects without company go to all project users.
+
+        Args:
+            changes: dict {project_id: (old_state, new_state)}, see _apply_financial_changes
+        """
+        project_ids_by_company = defaultdict(set)
+        for project_id, project_states in changes.items():
+            # A project moved to another company changes the figures of both
+            for state in project_states:
+                if state:
+                    project_ids_by_company[state['company_id'] or False].add(project_id)
+
+        for company_id, project_ids in project_ids_by_company.items():
+            target = self.env['res.company'].browse(company_id) if company_id else self.env.ref('project.group_project_user')
+            target._bus_send(FINANCIAL_BUS_NOTIFICATION, {
+                'company_id': company_id,
+                'project_ids': sorted(project_ids),
+            })
+
+    @api.model
+    def _read_group(self, domain, groupby=(), aggregates=(), having=(), offset=0, limit=None, order=None):
+        preset = self._get_financial_summary_preset(domain, groupby, aggregates, having, offset)
+        if preset:
+            # Totals of the whole dashboard, one row lookup instead of a full-table aggregate
+            return [self.env['project.analytics.summary']._get_summary_totals(preset, self.env.companies, aggregates)]
+        return super()._read_group(domain, groupby, aggregates, having, offset, limit, order)
+
+    @api.model
+    def _get_financial_summary_preset(self, domain, groupby=(), aggregates=(), having=(), offset=0):
+        """
+        Preset of project.analytics.summary that answers an ungrouped aggregation, if any.
+
+        Only reads of the dashboard (context key project_statistic_summary, set by
+        action_project_analytics_report) are considered. Of those, only counts and
+        sums of the financial figures over exactly a preset domain are answered
+        from the summary, and only for project managers: they see every project
+        of their companies, like the summary does.
+
+        Returns:
+            str or None
+        """
+        if not self.env.context.get('project_statistic_summary'):
+            return None
+        if groupby or having or offset or not aggregates or not self.env.context.get('active_test', True):
+            return None
+        financial_field_names = set(self._get_financial_field_names())
+        if any(
+            spec != '__count' and not (spec.endswith(':sum') and spec[:-len(':sum')] in financial_field_names)
+            for spec in aggregates
+        ):
+            return None
+        if self.env.su or not self.env.user.has_group('project.group_project_manager'):
+            return None
+
+        normalized = [tuple(item) if isinstance(item, list) else item for item in expression.normalize_domain(list(domain or []))]
+        for preset, preset_domain in SUMMARY_PRESET_DOMAINS.items():
+            if normalized == expression.normalize_domain(preset_domain):
+                return preset
+        return None
+
+    def _get_financial_period(self):
+        """
+        Read the reporting period from the context.
+
+        Supported context keys:
+        - financial_date_from: first day of the period (optional)
+        - financial_date_to: "as-of" date, last day of the period (optional)
+
+        Returns:
+            tuple: (date_from, date_to), each a date or False
+        """
+        date_from = fields.Date.to_date(self.env.context.get('financial_date_from')) or False
+        date_to = fields.Date.to_date(self.env.context.get('financial_date_to')) or False
+        return date_from, date_to
+
+    @api.model
+    def _get_financial_date_domain(self, date_from=False, date_to=False, field_name='date'):
+        """
+        Build the domain restricting lines to the reporting period.
+        Both account.move.line.date and account.analytic.line.date are indexed.
+        """
+        domain = []
+        if date_from:
+            domain.append((field_name, '>=', date_from))
+        if date_to:
+            domain.append((field_name, '<=', date_to))
+        return domain
+
+    @api.model
+    def _iter_financial_line_chunks(self, model_name, domain):
+        """
+        Search lines and yield them in chunks of FINANCIAL_LINE_CHUNK_SIZE records.
+
+        Chunks are read with keyset pagination on id, so neither the ids nor the
+        records of the complete history are held at once. Each chunk is its own
+        prefetch set, and the lines of a chunk with their journal items and entries
+        are evicted from the cache before the next chunk is loaded. This keeps the
+        peak memory of a recompute bounded, however large a project's history is.
+        Nothing else is evicted, and a single chunk stays cached: the scan also
+        runs within postings, whose records must not be dropped from the cache.
+
+        Yields:
+            recordset of at most FINANCIAL_LINE_CHUNK_SIZE lines
+        """
+        Model = self.env[model_name]
+        lines = Model.search(domain, order='id', limit=FINANCIAL_LINE_CHUNK_SIZE)
+        while lines:
+            yield lines
+            if len(lines) < FINANCIAL_LINE_CHUNK_SIZE:
+                return
+            last_id = lines.ids[-1]
+            move_lines = lines.move_line_id if model_name == 'account.analytic.line' else lines
+            for records in (lines, move_lines, move_lines.move_id):
+                records.invalidate_recordset()
+            lines = Model.search(domain + [('id', '>', last_id)], order='id', limit=FINANCIAL_LINE_CHUNK_SIZE)
+
+    @api.model
+    def _get_empty_financial_figures(self):
+        return {
+            'customer_invoiced_amount': 0.0,
+            'customer_paid_amount': 0.0,
+            'customer_outstanding_amount': 0.0,
+            'vendor_bills_total': 0.0,
+            'customer_skonto_taken': 0.0,
+            'vendor_skonto_received': 0.0,
+            'total_costs_net': 0.0,
+            'total_costs_with_tax': 0.0,
+            'profit_loss': 0.0,
+            'negative_difference': 0.0,
+            'total_hours_booked': 0.0,
+            'labor_costs': 0.0,
+        }
+
+    @api.model
+    def _get_financial_field_names(self):
+        """The twelve stored financial measures, in display order."""
+        return list(self._get_empty_financial_figures())
+
+    def _get_financial_analytic_accounts(self):
+        """
+        Get the analytic account associated with each project (projects plan ONLY).
+
+        Returns:
+            dict: {project_id: account.analytic.account} for projects that have one
+        """
+        # Get the standard project analytic plan reference
+        try:
+            project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
+        except Exception:
+            project_plan = None
+
+        result = {}
+        for project in self:
+            analytic_account = None
 
             if hasattr(project, 'analytic_account_id') and project.analytic_account_id:
                 # Verify this is the project plan
@@ -174,49 +486,91 @@ class ProjectAnalytics(models.Model):
                     f"2) This project has an analytic account assigned (Projects plan), "
                     f"3) Invoice/bill lines have analytic_distribution set."
                 )
-                project.customer_invoiced_amount = 0.0
-                project.customer_paid_amount = 0.0
-                project.customer_outstanding_amount = 0.0
-                project.vendor_bills_total = 0.0
-                project.customer_skonto_taken = 0.0
-                project.vendor_skonto_received = 0.0
-                project.total_costs_net = 0.0
-                project.total_costs_with_tax = 0.0
-                project.profit_loss = 0.0
-                project.negative_difference = 0.0
-                project.total_hours_booked = 0.0
-                project.labor_costs = 0.0
                 continue
 
-            # 1. Calculate Customer Invoices (Revenue)
-            customer_data = self._get_customer_invoices_from_analytic(analytic_account)
-            customer_invoiced_amount = customer_data['invoiced']
-            customer_paid_amount = customer_data['paid']
+            result[project.id] = analytic_account
+        return result
+
+    @api.model
+    def _get_projects_for_analytic_accounts(self, analytic_account_ids):
+        """
+        Find the projects linked to the given analytic accounts.
+        Only searches the analytic account fields that exist in this database.
+        """
+        field_names = [name for name in ('analytic_account_id', 'account_id') if name in self._fields]
+        if not analytic_account_ids or not field_names:
+            return self.browse()
+        return self.search(expression.OR([
+            [(name, 'in', list(analytic_account_ids))] for name in field_names
+        ]))
+
+    def _compute_financial_figures(self, date_from=None, date_to=None):
+        """
+        Batch engine behind all financial figures.
+
+        Computes the twelve financial measures for every project in self with a fixed
+        number of queries per bucket (invoices, bills, skonto, timesheets, other costs,
+        taxes), independent of the number of projects.
+
+        Args:
+            date_from: only consider lines dated on or after this date
+            date_to: only consider lines dated on or before this date ("as of")
+            When both are None, the period is taken from the context. Pass False
+            explicitly to compute lifetime totals.
+
+        Returns:
+            dict: {project_id: {field_name: value}}
+        """
+        if date_from is None and date_to is None:
+            date_from, date_to = self._get_financial_period()
+
+        result = {project.id: self._get_empty_financial_figures() for project in self}
+
+        accounts_by_project = self._get_financial_analytic_accounts()
+        if not accounts_by_project:
+            return result
+
+        analytic_accounts = self.env['account.analytic.account'].union(*accounts_by_project.values())
+
+        # 1. Calculate Customer Invoices (Revenue)
+        customer_data = self._get_customer_invoices_from_analytic(analytic_accounts, date_from, date_to)
+
+        # 2. Calculate Vendor Bills (Direct Costs)
+        vendor_data = self._get_vendor_bills_from_analytic(analytic_accounts, date_from, date_to)
+
+        # 3. Calculate Skonto (Cash Discounts) from analytic lines
+        skonto_data = self._get_skonto_from_analytic(analytic_accounts, date_from, date_to)
 
-            # 2. Calculate Vendor Bills (Direct Costs)
-            vendor_data = self._get_vendor_bills_from_analytic(analytic_account)
-            vendor_bills_total = vendor_data['total']
+        # 4. Calculate Labor Costs (Timesheets), revalued at the cost-rate history if enabled
+        cost_rates = None
+        if self._is_labor_revaluation_enabled():
+            cost_rates = self.env['project.analytics.cost.rate']._get_cost_rate_table()
+        timesheet_data = self._get_timesheet_costs(accounts_by_project, date_from, date_to, cost_rates)
 
-            # 3. Calculate Skonto (Cash Discounts) from analytic lines
-            skonto_data = self._get_skonto_from_analytic(analytic_account)
-            customer_skonto_taken = skonto_data['customer_skonto']
-            vendor_skonto_received = skonto_data['vendor_skonto']
+        # 5. Calculate Other Costs (non-timesheet, non-bill analytic lines)
+        other_costs_data = self._get_other_costs_from_analytic(analytic_accounts, date_from, date_to)
 
-            # 4. Calculate Labor Costs (Timesheets)
-            timesheet_data = project._get_timesheet_costs(analytic_account, project.id)
-            total_hours_booked = timesheet_data['hours']
-            labor_costs = timesheet_data['costs']
+        # 6. Calculate taxes on internal costs
+        cost_taxes = self._calculate_costs_with_tax(analytic_accounts, date_from, date_to)
 
-            # 5. Calculate Other Costs (non-timesheet, non-bill analytic lines)
-            other_costs = self._get_other_costs_from_analytic(analytic_account)
+        for project_id, analytic_account in accounts_by_project.items():
+            account_id = analytic_account.id
+            customer_invoiced_amount = customer_data[account_id]['invoiced']
+            customer_paid_amount = customer_data[account_id]['paid']
+            vendor_bills_total = vendor_data[account_id]['total']
+            customer_skonto_taken = skonto_data[account_id]['customer_skonto']
+            vendor_skonto_received = skonto_data[account_id]['vendor_skonto']
+            total_hours_booked = timesheet_data[project_id]['hours']
+            labor_costs = timesheet_data[project_id]['costs']
+            other_costs = other_costs_data[account_id]
 
-            # 6. Calculate totals
+            # 7. Calculate totals
             total_costs_net = labor_costs + other_costs
-            total_costs_with_tax = self._calculate_costs_with_tax(analytic_account, labor_costs, other_costs)
+            total_costs_with_tax = total_costs_net + cost_taxes[account_id]
 
             customer_outstanding_amount = customer_invoiced_amount - customer_paid_amount
 
-            # 6. Calculate Profit/Loss (Accrual basis with Skonto adjustments)
+            # 8. Calculate Profit/Loss (Accrual basis with Skonto adjustments)
             # Revenue: Invoiced amount - Skonto taken by customers
             # Costs: Vendor bills - Skonto received + internal costs
             adjusted_revenue = customer_invoiced_amount - customer_skonto_taken
@@ -224,21 +578,239 @@ class ProjectAnalytics(models.Model):
             profit_loss = adjusted_revenue - (adjusted_vendor_costs + total_costs_net)
             negative_difference = abs(min(0, profit_loss))
 
-            # Update all computed fields
-            project.customer_invoiced_amount = customer_invoiced_amount
-            project.customer_paid_amount = customer_paid_amount
-            project.customer_outstanding_amount = customer_outstanding_amount
-            project.vendor_bills_total = vendor_bills_total
-            project.customer_skonto_taken = customer_skonto_taken
-            project.vendor_skonto_received = vendor_skonto_received
-            project.total_costs_net = total_costs_net
-            project.total_costs_with_tax = total_costs_with_tax
-            project.profit_loss = profit_loss
-            project.negative_difference = negative_difference
-            project.total_hours_booked = total_hours_booked
-            project.labor_costs = labor_costs
-
-    def _get_customer_invoices_from_analytic(self, analytic_account):
+            result[project_id] = {
+                'customer_invoiced_amount': customer_invoiced_amount,
+                'customer_paid_amount': customer_paid_amount,
+                'customer_outstanding_amount': customer_outstanding_amount,
+                'vendor_bills_total': vendor_bills_total,
+                'customer_skonto_taken': customer_skonto_taken,
+                'vendor_skonto_received': vendor_skonto_received,
+                'total_costs_net': total_costs_net,
+                'total_costs_with_tax': total_costs_with_tax,
+                'profit_loss': profit_loss,
+                'negative_difference': negative_difference,
+                'total_hours_booked': total_hours_booked,
+                'labor_costs': labor_costs,
+            }
+
+        return result
+
+    @contextmanager
+    def _financial_replica_env(self, max_lag=None):
+        """
+        Open an environment on the read-only replica configured in the server config.
+
+        Server config options:
+        - project_statistic_replica_dsn: postgresql:// URI of the replica (libpq
+          key/value DSNs are not supported and disable the replica)
+        - project_statistic_replica_max_lag: maximum replication lag in seconds (default 30)
+
+        Args:
+            max_lag: maximum lag in seconds for this read, overrides the config option
+
+        Yields:
+            Environment on the replica, or None when no replica is configured,
+            it cannot be reached or it lags behind too much
+        """
+        dsn = config.get('project_statistic_replica_dsn')
+        if not dsn:
+            yield None
+            return
+        if not dsn.startswith(('postgresql://', 'postgres://')):
+            # db_connect would take anything else for a database name
+            _logger.warning("project_statistic_replica_dsn must be a postgresql:// URI, using the primary")
+            yield None
+            return
+
+        try:
+            cr = sql_db.db_connect(dsn, allow_uri=True).cursor()
+        except Exception as e:
+            _logger.warning(f"Read replica for project statistics not available, using the primary: {e}")
+            yield None
+            return
+
+        try:
+            cr.execute("SET TRANSACTION READ ONLY")
+            cr.execute("""
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+            """)
+            lag = cr.fetchone()[0]
+            if max_lag is None:
+                max_lag = float(config.get('project_statistic_replica_max_lag') or 30)
+            if lag > max_lag:
+                _logger.warning(f"Read replica lags {lag:.0f}s behind (max {max_lag:.0f}s), using the primary")
+                yield None
+            else:
+                # Share the primary's registry, the replica has the same schema
+                cr.transaction = Transaction(self.env.registry)
+                yield api.Environment(cr, self.env.uid, self.env.context, su=self.env.su)
+        finally:
+            cr.close()
+
+    def _read_financial_figures(self, date_from=None, date_to=None, max_lag=None):
+        """
+        Run the batch engine for bulk reads, on the read replica when one is configured.
+
+        Only use this for data that is already committed: lines and projects of the
+        current transaction are not visible on the replica. Projects whose figures
+        were recomputed on the primary after the replica's snapshot (their
+        financial_data_computed_at differs) are computed on the primary. Falls back
+        to the primary when the replica is not usable.
+
+        Args:
+            max_lag: maximum replication lag in seconds, see _financial_replica_env
+
+        Returns:
+            dict: {project_id: {field_name: value}}, see _compute_financial_figures
+        """
+        if date_from is None and date_to is None:
+            date_from, date_to = self._get_financial_period()
+
+        figures = None
+        with self._financial_replica_env(max_lag) as replica_env:
+            if replica_env is not None:
+                try:
+                    replica_projects = self.with_env(replica_env)
+                    figures = replica_projects._compute_financial_figures(date_from, date_to)
+                    replica_states = replica_projects._read_financial_state(self.ids)
+                except Exception as e:
+                    figures = None
+                    _logger.warning(f"Computing project figures on the read replica failed, using the primary: {e}")
+        if figures is None:
+            return self._compute_financial_figures(date_from, date_to)
+
+        self.flush_recordset(['financial_data_computed_at'])
+        primary_states = self._read_financial_state(self.ids)
+        stale = self.browse([
+            project_id for project_id, state in primary_states.items()
+            if project_id not in replica_states
+            or replica_states[project_id]['financial_data_computed_at'] != state['financial_data_computed_at']
+        ])
+        if stale:
+            figures.update(stale._compute_financial_figures(date_from, date_to))
+        return figures
+
+    def _refresh_financial_data(self):
+        """
+        Bulk recompute of the stored figures.
+
+        The aggregation runs through _read_financial_figures on the read replica
+        if one is configured and has caught up (no lag): the figures are stamped
+        as current, so they must not be older than the lines on the primary. The
+        results are written on the primary.
+        """
+        self._snapshot_financial_state()
+        figures = self._read_financial_figures(date_from=False, date_to=False, max_lag=0)
+        now = fields.Datetime.now()
+        for project in self:
+            project.update(dict(figures[project.id], financial_data_computed_at=now))
+
+    @api.model
+    def _cron_backfill_financial_data(self):
+        """
+        Fill the figures of projects that were never computed, e.g. after the
+        module was installed or upgraded (see _auto_init).
+
+        Works through the batch path in chunks of FINANCIAL_BACKFILL_CHUNK_SIZE
+        projects with a commit after each chunk. When the time limit is reached,
+        the next run is triggered right away.
+        """
+        domain = [('financial_data_computed_at', '=', False)]
+        start = time.monotonic()
+        done = 0
+        while True:
+            projects = self.with_context(active_test=False).search(domain, limit=FINANCIAL_BACKFILL_CHUNK_SIZE, order='id')
+            if not projects:
+                break
+            projects._refresh_financial_data()
+            done += len(projects)
+            if self.env.registry.in_test_mode():
+                self.env.flush_all()
+            else:
+                self.env.cr.commit()
+            if time.monotonic() - start > FINANCIAL_BACKFILL_TIME_LIMIT:
+                self.env.ref('project_statistic.ir_cron_backfill_financial_data')._trigger()
+                break
+        if done:
+            _logger.info(f"Backfilled financial data of {done} project(s)")
+
+    @api.model
+    def _is_labor_revaluation_enabled(self):
+        """Labor costs are revalued at the cost-rate history (system parameter project_statistic.labor_revaluation)."""
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param('project_statistic.labor_revaluation', 'False'))
+
+    @api.model
+    def _revalue_labor_costs(self):
+        """
+        Revalue the stored labor costs of all projects at the cost-rate history.
+
+        The cost-rate table is built once for the whole run. Per chunk of
+        FINANCIAL_BACKFILL_CHUNK_SIZE projects only the timesheets are aggregated
+        again; the totals depending on the labor costs are corrected by the
+        difference, the other buckets are not recomputed. Frozen projects are
+        revalued as well, since a retroactive rate change corrects their history.
+        Projects that were never computed are left to the backfill. Committed
+        after each chunk.
+
+        Returns:
+            int: number of projects whose labor costs changed
+        """
+        cost_rates = self.env['project.analytics.cost.rate']._get_cost_rate_table()
+        start = time.monotonic()
+        revalued = 0
+        last_id = 0
+        while True:
+            projects = self.with_context(active_test=False).search(
+                [('id', '>', last_id), ('financial_data_computed_at', '!=', False)],
+                limit=FINANCIAL_BACKFILL_CHUNK_SIZE, order='id',
+            )
+            if not projects:
+                break
+            last_id = projects[-1].id
+
+            accounts_by_project = projects._get_financial_analytic_accounts()
+            timesheet_data = projects._get_timesheet_costs(accounts_by_project, False, False, cost_rates)
+            changed = projects.browse([
+                project_id for project_id, totals in timesheet_data.items()
+                if not float_is_zero(totals['costs'] - projects.browse(project_id).labor_costs, precision_digits=2)
+            ])
+            changed._snapshot_financial_state()
+            for project in changed:
+                delta = timesheet_data[project.id]['costs'] - project.labor_costs
+                profit_loss = project.profit_loss - delta
+                project.update({
+                    'labor_costs': timesheet_data[project.id]['costs'],
+                    'total_costs_net': project.total_costs_net + delta,
+                    'total_costs_with_tax': project.total_costs_with_tax + delta,
+                    'profit_loss': profit_loss,
+                    'negative_difference': abs(min(0, profit_loss)),
+                })
+            self.env['project.analytics.period']._invalidate_periods(changed, False)
+            revalued += len(changed)
+
+            if self.env.registry.in_test_mode():
+                self.env.flush_all()
+            else:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+
+        _logger.info(
+            f"Revalued labor costs of {revalued} project(s) in {time.monotonic() - start:.1f}s "
+            f"with the cost rates of {len(cost_rates)} employee(s)"
+        )
+        return revalued
+
+    @api.model
+    def _cron_revalue_labor_costs(self):
+        """Full labor cost revaluation, scheduled whenever cost rates change."""
+        if self._is_labor_revaluation_enabled():
+            self._revalue_labor_costs()
+
+    def _get_customer_invoices_from_analytic(self, analytic_accounts, date_from=False, date_to=False):
         """
         Get customer invoices and credit notes via analytic_distribution in account.move.line.
         This is the Odoo v18 way to link invoices to projects.
@@ -249,67 +821,116 @@ class ProjectAnalytics(models.Model):
         Handles both:
         - out_invoice: Customer invoices (positive revenue)
         - out_refund: Customer credit notes (negative revenue)
+
+        Note: Without an as-of date the paid amount is derived from the invoice's current
+        residual. With one, it is taken from the reconciliations dated up to that date
+        (see _get_invoice_paid_amounts), so cached closed periods stay as-of figures.
+
+        Returns:
+            dict: {analytic_account_id: {'invoiced': amount, 'paid': amount}}
         """
-        result = {'invoiced': 0.0, 'paid': 0.0}
+        result = {account.id: {'invoiced': 0.0, 'paid': 0.0} for account in analytic_accounts}
+        account_keys = {str(account_id): account_id for account_id in result}
 
-        # Find all posted customer invoice/credit note lines with this analytic account
+        # Find all posted customer invoice/credit note lines with these analytic accounts
         # Filter by account_type to ensure we only get revenue/receivable lines
-        invoice_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
+        domain = [
+            ('analytic_distribution', 'in', analytic_accounts.ids),
             ('move_id.state', '=', 'posted'),
             ('move_id.move_type', 'in', ['out_invoice', 'out_refund']),
             ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
             '|',
             ('account_id.account_type', '=', 'income'),
             ('account_id.account_type', '=', 'income_other')
-        ])
+        ] + self._get_financial_date_domain(date_from, date_to)
 
-        for line in invoice_lines:
-            if not line.analytic_distribution:
-                continue
-
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            if line.move_id.reversed_entry_id:
-                continue
-
-            # Parse the analytic_distribution JSON
-            try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
-
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
-
-                    # Get the invoice to calculate payment proportion
-                    invoice = line.move_id
-
-                    # Calculate this line's contribution to the project
-                    # Use price_total (includes taxes) to match invoice.amount_total
-                    line_amount = line.price_total * percentage
-
-                    # Credit notes (out_refund) reduce revenue, so subtract them
-                    if invoice.move_type == 'out_refund':
-                        line_amount = -abs(line_amount)  # Ensure negative
-
-                    result['invoiced'] += line_amount
+        for invoice_lines in self._iter_financial_line_chunks('account.move.line', domain):
+            paid_as_of = self._get_invoice_paid_amounts(invoice_lines.move_id, date_to) if date_to else None
+            for line in invoice_lines:
+                if not line.analytic_distribution:
+                    continue
 
-                    # Calculate paid amount for this line
-                    # Payment proportion = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                    if abs(invoice.amount_total) > 0:
-                        payment_ratio = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                        line_paid = line_amount * payment_ratio
-                        result['paid'] += line_paid
+                # Skip reversal entries (Storno) - they cancel out the original entry
+                if line.move_id.reversed_entry_id:
+                    continue
 
-            except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
-                continue
+                # Parse the analytic_distribution JSON
+                try:
+                    distribution = line.analytic_distribution
+                    if isinstance(distribution, str):
+                        distribution = json.loads(distribution)
+
+                    for key, distribution_percentage in distribution.items():
+                        # Only keys of the analytic accounts of this batch
+                        account_id = account_keys.get(key)
+                        if account_id is None:
+                            continue
+
+                        # Get the percentage allocated to this project for THIS LINE
+                        percentage = (distribution_percentage or 0.0) / 100.0
+
+                        # Get the invoice to calculate payment proportion
+                        invoice = line.move_id
+
+                        # Calculate this line's contribution to the project
+                        # Use price_total (includes taxes) to match invoice.amount_total
+                        line_amount = line.price_total * percentage
+
+                        # Credit notes (out_refund) reduce revenue, so subtract them
+                        if invoice.move_type == 'out_refund':
+                            line_amount = -abs(line_amount)  # Ensure negative
+
+                        result[account_id]['invoiced'] += line_amount
+
+                        # Calculate paid amount for this line
+                        # Payment proportion = paid amount of the invoice / invoice.amount_total
+                        if abs(invoice.amount_total) > 0:
+                            if paid_as_of is None:
+                                invoice_paid = invoice.amount_total - invoice.amount_residual
+                            else:
+                                invoice_paid = paid_as_of.get(invoice.id, 0.0)
+                            payment_ratio = invoice_paid / invoice.amount_total
+                            line_paid = line_amount * payment_ratio
+                            result[account_id]['paid'] += line_paid
+
+                except Exception as e:
+                    _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
+                    continue
 
         return result
 
-    def _get_vendor_bills_from_analytic(self, analytic_account):
+    @api.model
+    def _get_invoice_paid_amounts(self, invoices, date_to):
+        """
+        Get the amounts of invoices paid on or before a date, from the partial
+        reconciliations of their receivable lines.
+
+        Returns:
+            dict: {move_id: paid amount in the invoice currency}, unpaid invoices are missing
+        """
+        if not invoices:
+            return {}
+        self.env['account.partial.reconcile'].flush_model([
+            'debit_move_id', 'credit_move_id', 'debit_amount_currency', 'credit_amount_currency', 'max_date',
+        ])
+        self.env.cr.execute(SQL(
+            """
+            SELECT line.move_id,
+                   SUM(CASE WHEN partial.debit_move_id = line.id THEN partial.debit_amount_currency
+                            ELSE partial.credit_amount_currency END)
+              FROM account_move_line line
+              JOIN account_partial_reconcile partial
+                ON partial.debit_move_id = line.id OR partial.credit_move_id = line.id
+             WHERE line.move_id = ANY(%s)
+               AND line.display_type = 'payment_term'
+               AND partial.max_date <= %s
+          GROUP BY line.move_id
+            """,
+            invoices.ids, date_to,
+        ))
+        return dict(self.env.cr.fetchall())
+
+    def _get_vendor_bills_from_analytic(self, analytic_accounts, date_from=False, date_to=False):
         """
         Get vendor bills and refunds via analytic_distribution in account.move.line.
         This is the Odoo v18 way to link bills to projects.
@@ -320,58 +941,67 @@ class ProjectAnalytics(models.Model):
         Handles both:
         - in_invoice: Vendor bills (positive cost)
         - in_refund: Vendor refunds (negative cost)
+
+        Returns:
+            dict: {analytic_account_id: {'total': amount}}
         """
-        result = {'total': 0.0}
+        result = {account.id: {'total': 0.0} for account in analytic_accounts}
+        account_keys = {str(account_id): account_id for account_id in result}
 
-        # Find all posted vendor bill/refund lines with this analytic account
+        # Find all posted vendor bill/refund lines with these analytic accounts
         # Filter by account_type to ensure we only get expense/payable lines
-        bill_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
+        domain = [
+            ('analytic_distribution', 'in', analytic_accounts.ids),
             ('move_id.state', '=', 'posted'),
             ('move_id.move_type', 'in', ['in_invoice', 'in_refund']),
             ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
             ('account_id.account_type', '=', 'expense')
-        ])
+        ] + self._get_financial_date_domain(date_from, date_to)
 
-        for line in bill_lines:
-            if not line.analytic_distribution:
-                continue
+        for bill_lines in self._iter_financial_line_chunks('account.move.line', domain):
+            for line in bill_lines:
+                if not line.analytic_distribution:
+                    continue
 
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            if line.move_id.reversed_entry_id:
-                continue
+                # Skip reversal entries (Storno) - they cancel out the original entry
+                if line.move_id.reversed_entry_id:
+                    continue
 
-            # Parse the analytic_distribution JSON
-            try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
+                # Parse the analytic_distribution JSON
+                try:
+                    distribution = line.analytic_distribution
+                    if isinstance(distribution, str):
+                        distribution = json.loads(distribution)
 
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
+                    for key, distribution_percentage in distribution.items():
+                        # Only keys of the analytic accounts of this batch
+                        account_id = account_keys.get(key)
+                        if account_id is None:
+                            continue
 
-                    # Get the bill to check type
-                    bill = line.move_id
+                        # Get the percentage allocated to this project for THIS LINE
+                        percentage = (distribution_percentage or 0.0) / 100.0
 
-                    # Calculate this line's contribution to the project
-                    # Use price_total (includes taxes) to match bill.amount_total
-                    line_amount = line.price_total * percentage
+                        # Get the bill to check type
+                        bill = line.move_id
 
-                    # Vendor refunds (in_refund) reduce costs, so subtract them
-                    if bill.move_type == 'in_refund':
-                        line_amount = -abs(line_amount)  # Ensure negative
+                        # Calculate this line's contribution to the project
+                        # Use price_total (includes taxes) to match bill.amount_total
+                        line_amount = line.price_total * percentage
 
-                    result['total'] += line_amount
+                        # Vendor refunds (in_refund) reduce costs, so subtract them
+                        if bill.move_type == 'in_refund':
+                            line_amount = -abs(line_amount)  # Ensure negative
 
-            except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for bill line {line.id}: {e}")
-                continue
+                        result[account_id]['total'] += line_amount
+
+                except Exception as e:
+                    _logger.warning(f"Error parsing analytic_distribution for bill line {line.id}: {e}")
+                    continue
 
         return result
 
-    def _get_skonto_from_analytic(self, analytic_account):
+    def _get_skonto_from_analytic(self, analytic_accounts, date_from=False, date_to=False):
         """
         Get Skonto (cash discounts) by querying analytic lines from discount accounts.
 
@@ -387,116 +1017,153 @@ class ProjectAnalytics(models.Model):
         - Account 2670 (asset account for vendor discounts)
 
         Returns:
-            dict: {'customer_skonto': amount, 'vendor_skonto': amount}
+            dict: {analytic_account_id: {'customer_skonto': amount, 'vendor_skonto': amount}}
         """
-        result = {'customer_skonto': 0.0, 'vendor_skonto': 0.0}
+        result = {account.id: {'customer_skonto': 0.0, 'vendor_skonto': 0.0} for account in analytic_accounts}
 
-        # Get all analytic lines for this account
-        analytic_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id)
-        ])
+        # Get all analytic lines for these accounts
+        domain = [
+            ('account_id', 'in', analytic_accounts.ids)
+        ] + self._get_financial_date_domain(date_from, date_to)
 
-        for line in analytic_lines:
-            if not line.move_line_id or not line.move_line_id.account_id:
-                continue
+        for analytic_lines in self._iter_financial_line_chunks('account.analytic.line', domain):
+            for line in analytic_lines:
+                if not line.move_line_id or not line.move_line_id.account_id:
+                    continue
 
-            account_code = line.move_line_id.account_id.code
-            if not account_code:
-                continue
+                account_code = line.move_line_id.account_id.code
+                if not account_code:
+                    continue
 
-            # Customer Skonto (Gewährte Skonti) - expense accounts 7300-7303 + liability 2130
-            # These reduce our revenue/profit (customer got discount)
-            if account_code.startswith(('7300', '7301', '7302', '7303', '2130')):
-                result['customer_skonto'] += abs(line.amount)
+                # Customer Skonto (Gewährte Skonti) - expense accounts 7300-7303 + liability 2130
+                # These reduce our revenue/profit (customer got discount)
+                if account_code.startswith(('7300', '7301', '7302', '7303', '2130')):
+                    result[line.account_id.id]['customer_skonto'] += abs(line.amount)
 
-            # Vendor Skonto (Erhaltene Skonti) - income accounts 4730-4733 + asset 2670
-            # These increase our profit (we got discount from vendor)
-            elif account_code.startswith(('4730', '4731', '4732', '4733', '2670')):
-                result['vendor_skonto'] += abs(line.amount)
+                # Vendor Skonto (Erhaltene Skonti) - income accounts 4730-4733 + asset 2670
+                # These increase our profit (we got discount from vendor)
+                elif account_code.startswith(('4730', '4731', '4732', '4733', '2670')):
+                    result[line.account_id.id]['vendor_skonto'] += abs(line.amount)
 
         return result
 
-    def _get_timesheet_costs(self, analytic_account, project_id=None):
+    def _get_timesheet_costs(self, accounts_by_project, date_from=False, date_to=False, cost_rates=None):
         """
         Get timesheet hours and costs from account.analytic.line.
         Timesheets have is_timesheet=True.
 
-        Uses a two-step approach:
-        1. First try to filter by project_id (if available) to get more specific results
-        2. If no results, fall back to analytic_account only
+        Uses a two-step approach per project:
+        1. Lines of the analytic account that are booked on the project itself
+        2. If there are none, fall back to all lines of the analytic account
 
         Args:
-            analytic_account: The analytic account to search for
-            project_id: Optional project ID to filter by (defaults to self.id if self is singleton)
+            accounts_by_project: dict {project_id: analytic account} as returned by
+                _get_financial_analytic_accounts
+            cost_rates: cost-rate table of project.analytics.cost.rate._get_cost_rate_table.
+                When given, the hours are revalued at the employee's rate on the day they
+                were logged instead of taking the booked amount (labor revaluation mode).
+
+        Returns:
+            dict: {project_id: {'hours': amount, 'costs': amount}}
         """
-        result = {'hours': 0.0, 'costs': 0.0}
+        result = {project_id: {'hours': 0.0, 'costs': 0.0} for project_id in accounts_by_project}
+        if not accounts_by_project:
+            return result
 
-        # Use provided project_id or self.id if singleton
-        if project_id is None:
-            if len(self) == 1:
-                project_id = self.id
-            else:
-                project_id = False
+        account_ids = list({account.id for account in accounts_by_project.values()})
 
-        # Build the base domain
-        timesheet_domain = [
-            ('account_id', '=', analytic_account.id),
+        # Aggregate once per analytic account and per (analytic account, project)
+        totals_by_account = {}
+        totals_by_project = {}
+        domain = [
+            ('account_id', 'in', account_ids),
             ('is_timesheet', '=', True)
-        ]
-
-        # Try to add project_id filter if the field exists
-        timesheet_lines = self.env['account.analytic.line']
-        if project_id and hasattr(self.env['account.analytic.line'], 'project_id'):
-            # First attempt: search with project_id filter
-            timesheet_domain_with_project = timesheet_domain + [('project_id', '=', project_id)]
-            timesheet_lines = self.env['account.analytic.line'].search(timesheet_domain_with_project)
-
-            # If no results with project filter, try without it
-            if not timesheet_lines:
-                timesheet_lines = self.env['account.analytic.line'].search(timesheet_domain)
-        else:
-            # No project_id field, just use analytic_account filter
-            timesheet_lines = self.env['account.analytic.line'].search(timesheet_domain)
-
-        for line in timesheet_lines:
-            result['hours'] += line.unit_amount or 0.0
-            result['costs'] += abs(line.amount or 0.0)
+        ] + self._get_financial_date_domain(date_from, date_to)
+
+        for account_id, project_id, hours, costs in self._iter_timesheet_amounts(domain, cost_rates):
+            account_totals = totals_by_account.setdefault(account_id, {'hours': 0.0, 'costs': 0.0})
+            account_totals['hours'] += hours
+            account_totals['costs'] += costs
+            if project_id:
+                project_totals = totals_by_project.setdefault((account_id, project_id), {'hours': 0.0, 'costs': 0.0})
+                project_totals['hours'] += hours
+                project_totals['costs'] += costs
+
+        for project_id, analytic_account in accounts_by_project.items():
+            totals = totals_by_project.get((analytic_account.id, project_id))
+            if totals is None:
+                # No lines booked on the project itself, use the analytic account only
+                totals = totals_by_account.get(analytic_account.id)
+            if totals:
+                result[project_id] = dict(totals)
 
         return result
 
-    def _get_other_costs_from_analytic(self, analytic_account):
+    def _iter_timesheet_amounts(self, domain, cost_rates=None):
+        """
+        Yield (analytic account id, project id, hours, costs) for the timesheets matching domain.
+
+        Without cost rates, the booked amount of every line is used. With cost rates,
+        the hours are summed per employee and day in the database and revalued with
+        the rate valid on that day; hours without a known rate keep their booked amount.
+        """
+        AnalyticLine = self.env['account.analytic.line']
+        has_project_field = 'project_id' in AnalyticLine._fields
+
+        if cost_rates is None:
+            for timesheet_lines in self._iter_financial_line_chunks('account.analytic.line', domain):
+                for line in timesheet_lines:
+                    project_id = line.project_id.id if has_project_field else False
+                    yield line.account_id.id, project_id, line.unit_amount or 0.0, abs(line.amount or 0.0)
+            return
+
+        CostRate = self.env['project.analytics.cost.rate']
+        groupby = ['account_id', 'employee_id', 'date:day'] + (['project_id'] if has_project_field else [])
+        for account, employee, day, *project, hours, amount in AnalyticLine._read_group(
+            domain, groupby, ['unit_amount:sum', 'amount:sum'],
+        ):
+            hours = hours or 0.0
+            hourly_cost = CostRate._get_hourly_cost(cost_rates, employee.id, day)
+            costs = hours * hourly_cost if hourly_cost is not None else abs(amount or 0.0)
+            yield account.id, project[0].id if project else False, hours, costs
+
+    def _get_other_costs_from_analytic(self, analytic_accounts, date_from=False, date_to=False):
         """
         Get other costs from analytic lines that are:
         - NOT timesheets (is_timesheet=False)
         - NOT from vendor bills (no move_line_id with in_invoice)
         - Negative amounts (costs are negative in Odoo)
+
+        Returns:
+            dict: {analytic_account_id: amount}
         """
-        other_costs = 0.0
+        other_costs = {account.id: 0.0 for account in analytic_accounts}
 
         # Find all cost lines (negative amounts, not timesheets)
-        cost_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
+        domain = [
+            ('account_id', 'in', analytic_accounts.ids),
             ('amount', '<', 0),
             ('is_timesheet', '=', False)
-        ])
+        ] + self._get_financial_date_domain(date_from, date_to)
 
-        for line in cost_lines:
-            # Check if this line is NOT from a vendor bill
-            is_from_vendor_bill = False
-            if line.move_line_id:
-                move = line.move_line_id.move_id
-                if move and move.move_type == 'in_invoice':
-                    is_from_vendor_bill = True
+        for cost_lines in self._iter_financial_line_chunks('account.analytic.line', domain):
+            for line in cost_lines:
+                # Check if this line is NOT from a vendor bill
+                is_from_vendor_bill = False
+                if line.move_line_id:
+                    move = line.move_line_id.move_id
+                    if move and move.move_type == 'in_invoice':
+                        is_from_vendor_bill = True
 
-            # Only count if it's not from a vendor bill
-            if not is_from_vendor_bill:
-                other_costs += abs(line.amount)
+                # Only count if it's not from a vendor bill
+                if not is_from_vendor_bill:
+                    other_costs[line.account_id.id] += abs(line.amount)
 
         return other_costs
 
-    def _calculate_costs_with_tax(self, analytic_account, labor_costs, other_costs):
+    def _calculate_costs_with_tax(self, analytic_accounts, date_from=False, date_to=False):
         """
-        Calculate total costs with tax included.
+        Calculate the tax to add on top of the net costs.
         In German accounting, we need to add VAT to costs.
 
         IMPORTANT: account.analytic.line.amount is typically the NET amount (without tax).
@@ -504,35 +1171,174 @@ class ProjectAnalytics(models.Model):
 
         Note: We only add tax for lines that have a move_line_id (journal entries).
         Labor costs from timesheets typically don't have taxes at this level.
+
+        Returns:
+            dict: {analytic_account_id: tax amount}, total costs with tax are
+            the net costs plus this amount
         """
-        total_costs_with_tax = labor_costs + other_costs
+        cost_taxes = {account.id: 0.0 for account in analytic_accounts}
 
         # Get all cost lines that have journal entry references (these might have taxes)
-        cost_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
+        domain = [
+            ('account_id', 'in', analytic_accounts.ids),
             ('amount', '<', 0),
             ('move_line_id', '!=', False)  # Only lines with journal entries
+        ] + self._get_financial_date_domain(date_from, date_to)
+
+        for cost_lines in self._iter_financial_line_chunks('account.analytic.line', domain):
+            for line in cost_lines:
+                # Skip if already counted in vendor_bills_total (to avoid double counting)
+                if line.move_line_id and line.move_line_id.move_id:
+                    move = line.move_line_id.move_id
+                    if move.move_type in ['in_invoice', 'in_refund']:
+                        # This is from a vendor bill, tax already included in vendor_bills_total
+                        continue
+
+                # Add tax for non-vendor-bill expense lines
+                if line.move_line_id and line.move_line_id.tax_ids:
+                    line_amount = abs(line.amount)
+                    for tax in line.move_line_id.tax_ids:
+                        if tax.amount_type == 'percent':
+                            tax_amount = line_amount * (tax.amount / 100.0)
+                            cost_taxes[line.account_id.id] += tax_amount
+                        elif tax.amount_type == 'fixed':
+                            cost_taxes[line.account_id.id] += tax.amount
+
+        return cost_taxes
+
+    @api.model
+    def _get_bi_field_names(self):
+        """Columns published to BI tools, besides id and company."""
+        return ['name', 'client_name', 'head_of_project'] + self._get_financial_field_names() + ['financial_data_computed_at']
+
+    @api.model
+    def _get_bi_etag(self, after_id=0, limit=500):
+        """
+        Build the ETag of one page of the BI dataset.
+
+        Derived from the last recompute and write timestamps and the number of
+        projects visible to the user, so it changes whenever any figure changes.
+        """
+        [(computed_at, write_date, count)] = self._read_group(
+            [], aggregates=['financial_data_computed_at:max', 'write_date:max', '__count'],
+        )
+        key = f"{self.env.uid},{sorted(self.env.companies.ids)},{computed_at},{write_date},{count},{after_id},{limit}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    @api.model
+    def _get_bi_page(self, after_id=0, limit=500):
+        """
+        Read one page of the BI dataset with keyset pagination.
+
+        Reads the stored columns with a single query (access rules applied)
+        instead of going through the full ORM read path.
+
+        Args:
+            after_id: return projects with an id greater than this one
+            limit: maximum number of projects per page
+
+        Returns:
+            dict: {'items': [...], 'next_after_id': last id of the page or None}
+        """
+        field_names = ['id', 'company_id'] + self._get_bi_field_names()
+        query = self._search([('id', '>', after_id)], limit=limit, order='id')
+        self.env.cr.execute(query.select(*[
+            SQL.identifier(self._table, name) for name in field_names
+        ]))
+
+        items = []
+        for row in self.env.cr.fetchall():
+            item = dict(zip(field_names, row))
+            if isinstance(item['name'], dict):
+                # Translatable name is stored as JSONB
+                item['name'] = item['name'].get(self.env.lang) or item['name'].get('en_US')
+            if item['financial_data_computed_at']:
+                item['financial_data_computed_at'] = fields.Datetime.to_string(item['financial_data_computed_at'])
+            items.append(item)
+
+        return {
+            'items': items,
+            'next_after_id': items[-1]['id'] if len(items) == limit else None,
+        }
+
+    def _filter_financial_unfrozen(self):
+        """Projects to include in bulk recomputes: frozen projects keep their stored figures."""
+        return self.filtered(lambda project: not project.financial_frozen)
+
+    def _get_open_invoice_analytic_account_ids(self, analytic_accounts):
+        """
+        Get the analytic accounts with posted customer invoices or vendor bills
+        that are not (fully) paid yet.
+
+        Returns:
+            set: analytic account ids
+        """
+        if not analytic_accounts:
+            return set()
+        open_lines = self.env['account.move.line'].search([
+            ('analytic_distribution', 'in', analytic_accounts.ids),
+            ('move_id.state', '=', 'posted'),
+            ('move_id.move_type', 'in', ['out_invoice', 'out_refund', 'in_invoice', 'in_refund']),
+            ('move_id.payment_state', 'in', ['not_paid', 'partial']),
+            ('display_type', 'not in', ['line_section', 'line_note']),
         ])
+        distribution_keys = set()
+        for line in open_lines:
+            distribution_keys.update(line.analytic_distribution or {})
+        return {account_id for account_id in analytic_accounts.ids if str(account_id) in distribution_keys}
 
-        for line in cost_lines:
-            # Skip if already counted in vendor_bills_total (to avoid double counting)
-            if line.move_line_id and line.move_line_id.move_id:
-                move = line.move_line_id.move_id
-                if move.move_type in ['in_invoice', 'in_refund']:
-                    # This is from a vendor bill, tax already included in vendor_bills_total
-                    continue
+    def _update_financial_frozen(self, recompute=True):
+        """
+        Freeze projects that reached a closed (folded) stage and have no open
+        invoices or bills, thaw frozen projects that left the closed stage.
 
-            # Add tax for non-vendor-bill expense lines
-            if line.move_line_id and line.move_line_id.tax_ids:
-                line_amount = abs(line.amount)
-                for tax in line.move_line_id.tax_ids:
-                    if tax.amount_type == 'percent':
-                        tax_amount = line_amount * (tax.amount / 100.0)
-                        total_costs_with_tax += tax_amount
-                    elif tax.amount_type == 'fixed':
-                        total_costs_with_tax += tax.amount
+        Args:
+            recompute: recompute the figures one last time before a project is
+                frozen; pass False when they were just refreshed
+        """
+        accounts_by_project = self._get_financial_analytic_accounts()
+        analytic_accounts = self.env['account.analytic.account'].union(*accounts_by_project.values())
+        open_account_ids = self._get_open_invoice_analytic_account_ids(analytic_accounts)
 
-        return total_costs_with_tax
+        to_freeze = self.browse()
+        to_thaw = self.browse()
+        for project in self:
+            analytic_account = accounts_by_project.get(project.id)
+            is_closed = bool(project.stage_id.fold) if 'stage_id' in project._fields else False
+            should_freeze = is_closed and not (analytic_account and analytic_account.id in open_account_ids)
+            if should_freeze and not project.financial_frozen:
+                to_freeze |= project
+            elif not should_freeze and project.financial_frozen:
+                to_thaw |= project
+
+        if to_freeze:
+            if recompute:
+                to_freeze._compute_financial_data()
+            to_freeze.write({'financial_frozen': True})
+            _logger.info(f"Froze financial data of {len(to_freeze)} closed project(s)")
+        if to_thaw:
+            to_thaw.write({'financial_frozen': False})
+            _logger.info(f"Thawed financial data of {len(to_thaw)} project(s)")
+
+    @api.model
+    def _thaw_financial_data(self, analytic_account_ids):
+        """
+        Thaw the frozen projects of analytic accounts that got a new line.
+        Runs as superuser: whoever books the line may not be allowed to write the project.
+        """
+        projects = self.sudo()._get_projects_for_analytic_accounts(analytic_account_ids).filtered('financial_frozen')
+        if projects:
+            projects.write({'financial_frozen': False})
+            _logger.info(f"Thawed financial data of {len(projects)} project(s) after new analytic lines")
+        return projects
+
+    @api.model
+    def _cron_update_financial_frozen(self):
+        """Freeze projects in closed stages once their last invoice or bill is paid."""
+        domain = [('financial_frozen', '=', False)]
+        if 'stage_id' in self._fields:
+            domain.append(('stage_id.fold', '=', True))
+        self.search(domain)._update_financial_frozen()
 
     def action_view_account_analytic_line(self):
         """
@@ -569,6 +1375,17 @@ class ProjectAnalytics(models.Model):
             'target': 'current',
         }
 
+    def action_view_financial_ledger(self):
+        """
+        Open the lines behind the financial figures of this project, by bucket.
+        Their amounts add up to the stored figures.
+        """
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id('project_statistic.action_project_analytics_ledger')
+        action['name'] = f'Buchungsjournal - {self.name}'
+        action['domain'] = [('project_id', '=', self.id)]
+        return action
+
     def action_open_project_dashboard(self):
         """
         Open the standard project dashboard/form view for this project.
@@ -624,14 +1441,20 @@ class ProjectAnalytics(models.Model):
         """
         Manually refresh/recompute all financial data for selected projects.
         This is useful when invoices or analytic lines are added/modified.
+        Frozen projects keep their stored figures and are skipped.
         """
-        self._compute_financial_data()
+        projects = self._filter_financial_unfrozen()
+        projects._refresh_financial_data()
+        projects._update_financial_frozen(recompute=False)
+        message = f'Financial data has been recalculated for {len(projects)} project(s).'
+        if len(projects) < len(self):
+            message += f' {len(self) - len(projects)} frozen project(s) skipped.'
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': 'Financial Data Refreshed',
-                'message': f'Financial data has been recalculated for {len(self)} project(s).',
+                'message': message,
                 'type': 'success',
                 'sticky': False,
             }
@@ -0,0 +1,123 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class ProjectAnalyticsAggregateMixin(models.AbstractModel):
+    """
+    Totals of the project figures per key, kept current incrementally.
+
+    Inheriting models define the key columns (_aggregate_key_fields) and which
+    rows a project contributes to (_get_aggregate_keys). The precommit journal of
+    project.project calls _apply_project_changes with the changes of the
+    transaction, which appends them to project.analytics.aggregate.delta; they
+    are folded into the totals in the background with one upsert per run.
+    """
+    _name = 'project.analytics.aggregate.mixin'
+    _description = 'Project Analytics Aggregate'
+
+    # Columns identifying a row, in the order of the keys of _get_aggregate_keys
+    _aggregate_key_fields = []
+
+    project_count = fields.Integer(string='Projects', readonly=True, group_operator='sum')
+
+    customer_invoiced_amount = fields.Float(string='Total Invoiced Amount', readonly=True, group_operator='sum')
+    customer_paid_amount = fields.Float(string='Total Paid Amount', readonly=True, group_operator='sum')
+    customer_outstanding_amount = fields.Float(string='Outstanding Amount', readonly=True, group_operator='sum')
+    vendor_bills_total = fields.Float(string='Vendor Bills Total', readonly=True, group_operator='sum')
+    customer_skonto_taken = fields.Float(string='Customer Cash Discounts (Skonto)', readonly=True, group_operator='sum')
+    vendor_skonto_received = fields.Float(string='Vendor Cash Discounts Received', readonly=True, group_operator='sum')
+    total_costs_net = fields.Float(string='Net Costs (without tax)', readonly=True, group_operator='sum')
+    total_costs_with_tax = fields.Float(string='Total Costs (with tax)', readonly=True, group_operator='sum')
+    profit_loss = fields.Float(string='Profit/Loss Amount', readonly=True, group_operator='sum')
+    negative_difference = fields.Float(string='Negative Differences (losses)', readonly=True, group_operator='sum')
+    total_hours_booked = fields.Float(string='Total Hours Booked', readonly=True, group_operator='sum')
+    labor_costs = fields.Float(string='Labor Costs', readonly=True, group_operator='sum')
+
+    def _get_aggregate_key_sql(self):
+        """Key expression of the unique index, empty many2one keys are stored as NULL."""
+        return SQL(', ').join(
+            SQL("COALESCE(%s, 0)", SQL.identifier(name)) if self._fields[name].type == 'many2one' else SQL.identifier(name)
+            for name in self._aggregate_key_fields
+        )
+
+    def _init_aggregate_index(self):
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX IF NOT EXISTS %s ON %s (%s)",
+            SQL.identifier(f'{self._table}_key_uniq'), SQL.identifier(self._table), self._get_aggregate_key_sql(),
+        ))
+
+    @api.model
+    def _get_aggregate_keys(self, state):
+        """
+        Rows a project contributes to.
+
+        Args:
+            state: project state as returned by project.project._read_financial_state
+        Returns:
+            list: tuples of the values of _aggregate_key_fields
+        """
+        raise NotImplementedError()
+
+    @api.model
+    def _apply_project_changes(self, changes):
+        """
+        Record the deltas of project-level changes in the aggregate journal.
+
+        Args:
+            changes: dict {project_id: (old_state, new_state)}, a state is None
+                when the project did not exist before or does not exist anymore
+        """
+        field_names = self.env['project.project']._get_financial_field_names()
+
+        deltas = {}
+        for old_state, new_state in changes.values():
+            for state, sign in ((old_state, -1), (new_state, 1)):
+                for key in self._get_aggregate_keys(state):
+                    delta = deltas.setdefault(key, [0] + [0.0] * len(field_names))
+                    delta[0] += sign
+                    for index, name in enumerate(field_names, start=1):
+                        delta[index] += sign * (state[name] or 0.0)
+
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        self.env['project.analytics.aggregate.delta']._append_deltas(self._name, deltas)
+
+    @api.model
+    def _fold_aggregate_deltas(self, deltas):
+        """
+        Add folded deltas to the totals with one upsert.
+
+        Args:
+            deltas: dict {key: [project_count, measure, ...]}, measures in the
+                order of project.project._get_financial_field_names
+        """
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+
+        field_names = self.env['project.project']._get_financial_field_names()
+        table = SQL.identifier(self._table)
+        columns = ['project_count'] + field_names
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(table)s AS target
+                (%(keys)s, %(columns)s, create_uid, write_uid, create_date, write_date)
+            VALUES %(values)s
+            ON CONFLICT (%(conflict)s)
+            DO UPDATE SET %(updates)s, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+            """,
+            table=table,
+            keys=SQL(', ').join(SQL.identifier(name) for name in self._aggregate_key_fields),
+            columns=SQL(', ').join(SQL.identifier(column) for column in columns),
+            values=SQL(', ').join(
+                SQL("(%s, %s, %s, %s, now() at time zone 'UTC', now() at time zone 'UTC')",
+                    SQL(', ').join(key), SQL(', ').join(delta), self.env.uid, self.env.uid)
+                for key, delta in deltas.items()
+            ),
+            conflict=self._get_aggregate_key_sql(),
+            updates=SQL(', ').join(
+                SQL("%s = target.%s + EXCLUDED.%s", SQL.identifier(column), SQL.identifier(column), SQL.identifier(column))
+                for column in columns
+            ),
+        ))
+        self.env.cr.execute(SQL("DELETE FROM %s WHERE project_count <= 0", table))
+        self.invalidate_model()
@@ -0,0 +1,81 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from collections import defaultdict
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectAnalyticsAggregateDelta(models.Model):
+    """
+    Journal of the changes to the aggregated project figures.
+
+    Transactions only append their deltas here, so concurrent postings never
+    update the same row. The deltas are folded into the aggregate rows in the
+    background (_cron_fold_aggregate_deltas).
+    """
+    _name = 'project.analytics.aggregate.delta'
+    _description = 'Project Analytics Aggregate Delta'
+    _log_access = False
+
+    res_model = fields.Char(string='Aggregate Model', required=True, readonly=True)
+    key = fields.Json(string='Key', readonly=True)
+    delta = fields.Json(string='Delta', readonly=True)
+
+    @api.model
+    def _append_deltas(self, res_model, deltas):
+        """
+        Append the deltas of an aggregate model and schedule folding them.
+
+        Args:
+            res_model: name of the project.analytics.aggregate.mixin model
+            deltas: dict {key: [project_count, measure, ...]}
+        """
+        if not deltas:
+            return
+        self.env.cr.execute(SQL(
+            "INSERT INTO project_analytics_aggregate_delta (res_model, key, delta) VALUES %s",
+            SQL(', ').join(
+                SQL("(%s, %s::jsonb, %s::jsonb)", res_model, json.dumps(list(key)), json.dumps(delta))
+                for key, delta in deltas.items()
+            ),
+        ))
+        # Any user posting lines journals deltas
+        self.env.ref('project_statistic.ir_cron_fold_aggregate_deltas').sudo()._trigger()
+
+    @api.model
+    def _discard_deltas(self, res_model):
+        """Drop the pending deltas of an aggregate model whose totals are rebuilt from the projects."""
+        self.env.cr.execute(SQL("DELETE FROM project_analytics_aggregate_delta WHERE res_model = %s", res_model))
+
+    @api.model
+    def _fold_deltas(self, res_model=None):
+        """
+        Fold the journal into the aggregate rows.
+
+        Only the deltas visible to this transaction are removed, deltas of
+        transactions committing meanwhile are left for the next run.
+
+        Args:
+            res_model: only fold the deltas of this aggregate model
+        """
+        condition = SQL("res_model = %s", res_model) if res_model else SQL("TRUE")
+        self.env.cr.execute(SQL(
+            "DELETE FROM project_analytics_aggregate_delta WHERE %s RETURNING res_model, key, delta",
+            condition,
+        ))
+        deltas_by_model = defaultdict(dict)
+        for model_name, key, delta in self.env.cr.fetchall():
+            total = deltas_by_model[model_name].setdefault(tuple(key), [0] * len(delta))
+            for index, value in enumerate(delta):
+                total[index] += value
+        for model_name, deltas in deltas_by_model.items():
+            self.env[model_name]._fold_aggregate_deltas(deltas)
+        return sum(len(deltas) for deltas in deltas_by_model.values())
+
+    @api.model
+    def _cron_fold_aggregate_deltas(self):
+        folded = self._fold_deltas()
+        if folded:
+            _logger.info(f"Folded {folded} project analytics aggregate delta(s)")
@@ -0,0 +1,126 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import AccessError
+from bisect import bisect_right
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectAnalyticsCostRate(models.Model):
+    _name = 'project.analytics.cost.rate'
+    _description = 'Project Analytics Employee Cost Rate'
+    _order = 'employee_id, date_from desc'
+
+    employee_id = fields.Many2one(
+        'hr.employee',
+        string='Employee',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    company_id = fields.Many2one(related='employee_id.company_id', store=True)
+    date_from = fields.Date(
+        string='Valid From',
+        required=True,
+        help="First day the rate applies to. It is valid until the day before the next rate of the employee."
+    )
+    hourly_cost = fields.Float(
+        string='Hourly Cost',
+        required=True,
+        help="Cost of one hour of the employee, used to revalue the labor costs of timesheets dated in its interval."
+    )
+
+    _sql_constraints = [
+        ('employee_date_uniq', 'unique(employee_id, date_from)',
+         'There can only be one cost rate per employee and start date.'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rates = super().create(vals_list)
+        self._trigger_labor_revaluation()
+        return rates
+
+    def write(self, vals):
+        result = super().write(vals)
+        self._trigger_labor_revaluation()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self._trigger_labor_revaluation()
+        return result
+
+    @api.model
+    def _trigger_labor_revaluation(self):
+        """
+        Drop the cached cost-rate table and schedule a revaluation run,
+        retroactive rate changes affect stored labor costs.
+        """
+        self.env.registry.clear_cache()
+        if self.env['project.project']._is_labor_revaluation_enabled():
+            self.env.ref('project_statistic.ir_cron_revalue_labor_costs')._trigger()
+
+    @api.model
+    @tools.ormcache()
+    def _get_cost_rate_table(self):
+        """
+        Load the cost-rate history of all employees with one query.
+
+        The table is cached per registry, so recomputes (e.g. on every posting)
+        do not reload it; changing a rate clears the cache. Do not modify it.
+
+        Returns:
+            dict: {employee_id: ([date_from, ...], [hourly_cost, ...])}, sorted by date
+        """
+        self.flush_model(['employee_id', 'date_from', 'hourly_cost'])
+        self.env.cr.execute("""
+            SELECT employee_id, date_from, hourly_cost
+              FROM project_analytics_cost_rate
+          ORDER BY employee_id, date_from
+        """)
+        table = {}
+        for employee_id, date_from, hourly_cost in self.env.cr.fetchall():
+            dates, rates = table.setdefault(employee_id, ([], []))
+            dates.append(date_from)
+            rates.append(hourly_cost)
+        return table
+
+    @api.model
+    def _get_hourly_cost(self, table, employee_id, date):
+        """
+        Look up the rate of an employee on a date in a table of _get_cost_rate_table.
+
+        Returns:
+            float or None: None when no rate of the employee covers the date
+        """
+        if employee_id not in table:
+            return None
+        dates, rates = table[employee_id]
+        index = bisect_right(dates, date) - 1
+        return rates[index] if index >= 0 else None
+
+    def action_revalue_labor_costs(self):
+        if not self.env.user.has_group('project.group_project_manager'):
+            raise AccessError(_("Only project managers can revalue labor costs."))
+        if not self.env['project.project']._is_labor_revaluation_enabled():
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'message': _('Labor cost revaluation is disabled (system parameter project_statistic.labor_revaluation).'),
+                    'type': 'warning',
+                    'sticky': False,
+                }
+            }
+        self.env.ref('project_statistic.ir_cron_revalue_labor_costs')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Revaluation Scheduled',
+                'message': 'The labor costs of all projects are revalued in the background.',
+                'type': 'success',
+                'sticky': False,
+            }
+        }
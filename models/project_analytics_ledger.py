@@ -0,0 +1,306 @@
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Buckets of the ledger, the position is the bucket number encoded in the id
+LEDGER_BUCKETS = [
+    ('invoice', 'Customer Invoice'),
+    ('bill', 'Vendor Bill'),
+    ('customer_skonto', 'Customer Skonto'),
+    ('vendor_skonto', 'Vendor Skonto'),
+    ('timesheet', 'Timesheet'),
+    ('other_cost', 'Other Cost'),
+    ('tax', 'Tax on Costs'),
+]
+# Buckets whose source is a journal item, the others come from analytic lines
+LEDGER_MOVE_LINE_BUCKETS = ('invoice', 'bill')
+
+# Layout of the id: project id | source line id (31 bits) | bucket number (3 bits).
+# Unique per row and decodable without reading the view (see _get_ledger_source).
+LEDGER_BUCKET_BITS = 3
+LEDGER_LINE_BITS = 31
+
+# Account code prefixes of the skonto buckets, see project.project._get_skonto_from_analytic
+CUSTOMER_SKONTO_PREFIXES = ('7300', '7301', '7302', '7303', '2130')
+VENDOR_SKONTO_PREFIXES = ('4730', '4731', '4732', '4733', '2670')
+
+
+class ProjectAnalyticsLedger(models.Model):
+    _name = 'project.analytics.ledger'
+    _description = 'Project Analytics Ledger'
+    _auto = False
+    _order = 'date desc, id desc'
+
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    analytic_account_id = fields.Many2one('account.analytic.account', string='Analytic Account', readonly=True)
+    bucket = fields.Selection(LEDGER_BUCKETS, string='Bucket', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    name = fields.Char(string='Label', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Partner', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    move_id = fields.Many2one('account.move', string='Journal Entry', readonly=True)
+    move_line_id = fields.Many2one('account.move.line', string='Journal Item', readonly=True)
+    analytic_line_id = fields.Many2one('account.analytic.line', string='Analytic Line', readonly=True)
+    amount = fields.Float(
+        string='Allocated Amount',
+        readonly=True,
+        group_operator='sum',
+        help="Amount this line contributes to the bucket's total of the project."
+    )
+    paid_amount = fields.Float(
+        string='Paid Amount',
+        readonly=True,
+        group_operator='sum',
+        help="Paid part of the allocated amount (customer invoices only)."
+    )
+    hours = fields.Float(string='Hours', readonly=True, group_operator='sum')
+
+    def init(self):
+        cr = self.env.cr
+        tools.drop_view_if_exists(cr, self._table)
+        cr.execute(SQL("CREATE OR REPLACE VIEW %s AS (%s)", SQL.identifier(self._table), self._get_ledger_query()))
+
+    @api.model
+    def _get_ledger_query(self):
+        """
+        SQL of the ledger: one row per project and contributing line of each bucket.
+
+        Replicates the rules of project.project._compute_financial_figures for
+        lifetime totals, so the amounts of a project add up to its stored figures.
+        """
+        cr = self.env.cr
+        project_accounts = [
+            name for name in ('analytic_account_id', 'account_id')
+            if column_exists(cr, 'project_project', name)
+        ]
+        # Same precedence as _get_financial_analytic_accounts: the first account in the projects plan
+        project_account = SQL("CASE %s END", SQL(" ").join(
+            SQL("WHEN %s.plan_id = plan.res_id THEN %s.id", SQL.identifier(f'{name}_account'), SQL.identifier(f'{name}_account'))
+            for name in project_accounts
+        )) if project_accounts else SQL("NULL::integer")
+        project_account_joins = SQL(" ").join(
+            SQL("LEFT JOIN account_analytic_account %s ON %s.id = project.%s",
+                SQL.identifier(f'{name}_account'), SQL.identifier(f'{name}_account'), SQL.identifier(name))
+            for name in project_accounts
+        )
+
+        if column_exists(cr, 'account_account', 'code_store'):
+            # Account codes are stored per root company
+            account_code = SQL("gl_account.code_store ->> split_part(gl_company.parent_path, '/', 1)")
+        else:
+            account_code = SQL("gl_account.code")
+
+        has_is_timesheet = column_exists(cr, 'account_analytic_line', 'is_timesheet')
+
+        def timesheet(alias):
+            if has_is_timesheet:
+                return SQL("%s.is_timesheet", SQL.identifier(alias))
+            return SQL("%s.project_id IS NOT NULL", SQL.identifier(alias))
+
+        def ledger_id(line_id, bucket):
+            number = [key for key, _label in LEDGER_BUCKETS].index(bucket)
+            return SQL(
+                "(pa.project_id::bigint << %s) | (%s::bigint << %s) | %s",
+                LEDGER_LINE_BITS + LEDGER_BUCKET_BITS, line_id, LEDGER_BUCKET_BITS, number,
+            )
+
+        # Same expression as the GIN index of analytic.mixin on account_move_line,
+        # so that the project-scoped joins below can use it
+        distribution_keys = SQL(
+            r"""regexp_split_to_array(jsonb_path_query_array(aml.analytic_distribution, '$.keyvalue()."key"')::text, '\D+')"""
+        )
+
+        revaluation_enabled = SQL("""
+            EXISTS (SELECT 1 FROM ir_config_parameter
+                     WHERE key = 'project_statistic.labor_revaluation'
+                       AND lower(value) IN ('y', 'yes', '1', 'true', 't', 'on'))
+        """)
+
+        return SQL(
+            """
+            WITH pa AS (
+                SELECT project_id, company_id, account_id
+                  FROM (
+                    SELECT project.id AS project_id, project.company_id, %(project_account)s AS account_id
+                      FROM project_project project
+                      JOIN ir_model_data plan ON plan.module = 'analytic' AND plan.name = 'analytic_plan_projects'
+                      %(project_account_joins)s
+                  ) accounts
+                 WHERE account_id IS NOT NULL
+            )
+            -- Customer invoices and credit notes, allocated by analytic distribution
+            SELECT %(invoice_id)s AS id, pa.project_id, pa.company_id, pa.account_id AS analytic_account_id,
+                   'invoice' AS bucket, aml.date, aml.name, aml.partner_id, NULL::integer AS employee_id,
+                   aml.move_id, aml.id AS move_line_id, NULL::integer AS analytic_line_id,
+                   invoice.amount::float AS amount,
+                   (invoice.amount * CASE WHEN move.amount_total != 0
+                       THEN (move.amount_total - move.amount_residual) / move.amount_total ELSE 0 END)::float AS paid_amount,
+                   0.0::float AS hours
+              FROM pa
+              JOIN account_move_line aml ON %(distribution_keys)s && ARRAY[pa.account_id::text]
+                                         AND aml.analytic_distribution ? pa.account_id::text
+              JOIN account_move move ON move.id = aml.move_id
+              JOIN account_account gl_account ON gl_account.id = aml.account_id
+              CROSS JOIN LATERAL (
+                SELECT CASE WHEN move.move_type = 'out_refund' THEN -ABS(allocation.share) ELSE allocation.share END AS amount
+                  FROM (SELECT aml.price_total * (aml.analytic_distribution ->> pa.account_id::text)::numeric / 100 AS share) allocation
+              ) invoice
+             WHERE move.state = 'posted'
+               AND move.move_type IN ('out_invoice', 'out_refund')
+               AND move.reversed_entry_id IS NULL
+               AND COALESCE(aml.display_type, '') NOT IN ('line_section', 'line_note')
+               AND gl_account.account_type IN ('income', 'income_other')
+
+            UNION ALL
+            -- Vendor bills and refunds, allocated by analytic distribution
+            SELECT %(bill_id)s, pa.project_id, pa.company_id, pa.account_id,
+                   'bill', aml.date, aml.name, aml.partner_id, NULL::integer,
+                   aml.move_id, aml.id, NULL::integer,
+                   CASE WHEN move.move_type = 'in_refund' THEN -ABS(bill.share) ELSE bill.share END,
+                   0.0, 0.0
+              FROM pa
+              JOIN account_move_line aml ON %(distribution_keys)s && ARRAY[pa.account_id::text]
+                                         AND aml.analytic_distribution ? pa.account_id::text
+              JOIN account_move move ON move.id = aml.move_id
+              JOIN account_account gl_account ON gl_account.id = aml.account_id
+              CROSS JOIN LATERAL (
+                SELECT aml.price_total * (aml.analytic_distribution ->> pa.account_id::text)::numeric / 100 AS share
+              ) bill
+             WHERE move.state = 'posted'
+               AND move.move_type IN ('in_invoice', 'in_refund')
+               AND move.reversed_entry_id IS NULL
+               AND COALESCE(aml.display_type, '') NOT IN ('line_section', 'line_note')
+               AND gl_account.account_type = 'expense'
+
+            UNION ALL
+            -- Skonto, by the account code of the journal item
+            SELECT CASE WHEN LEFT(skonto.code, 4) IN %(customer_prefixes)s THEN %(customer_skonto_id)s ELSE %(vendor_skonto_id)s END,
+                   pa.project_id, pa.company_id, pa.account_id,
+                   CASE WHEN LEFT(skonto.code, 4) IN %(customer_prefixes)s THEN 'customer_skonto' ELSE 'vendor_skonto' END,
+                   line.date, line.name, line.partner_id, NULL::integer,
+                   aml.move_id, aml.id, line.id,
+                   ABS(line.amount), 0.0, 0.0
+              FROM pa
+              JOIN account_analytic_line line ON line.account_id = pa.account_id
+              JOIN account_move_line aml ON aml.id = line.move_line_id
+              JOIN account_account gl_account ON gl_account.id = aml.account_id
+              JOIN res_company gl_company ON gl_company.id = aml.company_id
+              CROSS JOIN LATERAL (SELECT %(account_code)s AS code) skonto
+             WHERE LEFT(skonto.code, 4) IN %(skonto_prefixes)s
+
+            UNION ALL
+            -- Timesheets booked on the project, or on its account when none is booked on the project itself
+            SELECT %(timesheet_id)s, pa.project_id, pa.company_id, pa.account_id,
+                   'timesheet', line.date, line.name, line.partner_id, line.employee_id,
+                   NULL::integer, NULL::integer, line.id,
+                   COALESCE(line.unit_amount * rate.hourly_cost, ABS(line.amount)), 0.0, COALESCE(line.unit_amount, 0.0)
+              FROM pa
+              JOIN account_analytic_line line ON line.account_id = pa.account_id AND %(line_is_timesheet)s
+              LEFT JOIN LATERAL (
+                SELECT cost_rate.hourly_cost
+                  FROM project_analytics_cost_rate cost_rate
+                 WHERE cost_rate.employee_id = line.employee_id
+                   AND cost_rate.date_from <= line.date
+                   AND %(revaluation_enabled)s
+              ORDER BY cost_rate.date_from DESC
+                 LIMIT 1
+              ) rate ON TRUE
+             WHERE line.project_id = pa.project_id
+                OR NOT EXISTS (
+                    SELECT 1 FROM account_analytic_line own
+                     WHERE own.account_id = pa.account_id
+                       AND own.project_id = pa.project_id
+                       AND %(own_is_timesheet)s
+                )
+
+            UNION ALL
+            -- Other costs: negative analytic lines that are neither timesheets nor vendor bills
+            SELECT %(other_cost_id)s, pa.project_id, pa.company_id, pa.account_id,
+                   'other_cost', line.date, line.name, line.partner_id, NULL::integer,
+                   aml.move_id, aml.id, line.id,
+                   ABS(line.amount), 0.0, 0.0
+              FROM pa
+              JOIN account_analytic_line line ON line.account_id = pa.account_id
+              LEFT JOIN account_move_line aml ON aml.id = line.move_line_id
+              LEFT JOIN account_move move ON move.id = aml.move_id
+             WHERE line.amount < 0
+               AND NOT COALESCE(%(line_is_timesheet)s, FALSE)
+               AND COALESCE(move.move_type, '') != 'in_invoice'
+
+            UNION ALL
+            -- Taxes of negative analytic lines with a journal item, except vendor bills
+            SELECT %(tax_id)s, pa.project_id, pa.company_id, pa.account_id,
+                   'tax', line.date, line.name, line.partner_id, NULL::integer,
+                   aml.move_id, aml.id, line.id,
+                   tax.amount, 0.0, 0.0
+              FROM pa
+              JOIN account_analytic_line line ON line.account_id = pa.account_id
+              JOIN account_move_line aml ON aml.id = line.move_line_id
+              JOIN account_move move ON move.id = aml.move_id
+              CROSS JOIN LATERAL (
+                SELECT SUM(CASE account_tax.amount_type
+                           WHEN 'percent' THEN ABS(line.amount) * account_tax.amount / 100
+                           WHEN 'fixed' THEN account_tax.amount
+                           ELSE 0 END) AS amount
+                  FROM account_move_line_account_tax_rel rel
+                  JOIN account_tax ON account_tax.id = rel.account_tax_id
+                 WHERE rel.account_move_line_id = aml.id
+              ) tax
+             WHERE line.amount < 0
+               AND move.move_type NOT IN ('in_invoice', 'in_refund')
+               AND tax.amount IS NOT NULL
+            """,
+            project_account=project_account,
+            distribution_keys=distribution_keys,
+            project_account_joins=project_account_joins,
+            account_code=account_code,
+            customer_prefixes=CUSTOMER_SKONTO_PREFIXES,
+            skonto_prefixes=CUSTOMER_SKONTO_PREFIXES + VENDOR_SKONTO_PREFIXES,
+            line_is_timesheet=timesheet('line'),
+            own_is_timesheet=timesheet('own'),
+            revaluation_enabled=revaluation_enabled,
+            invoice_id=ledger_id(SQL("aml.id"), 'invoice'),
+            bill_id=ledger_id(SQL("aml.id"), 'bill'),
+            customer_skonto_id=ledger_id(SQL("line.id"), 'customer_skonto'),
+            vendor_skonto_id=ledger_id(SQL("line.id"), 'vendor_skonto'),
+            timesheet_id=ledger_id(SQL("line.id"), 'timesheet'),
+            other_cost_id=ledger_id(SQL("line.id"), 'other_cost'),
+            tax_id=ledger_id(SQL("line.id"), 'tax'),
+        )
+
+    def _get_ledger_source(self):
+        """
+        Decode the source of a ledger row from its id, without reading the view.
+
+        Returns:
+            tuple: (bucket, account.move.line or account.analytic.line record)
+        """
+        self.ensure_one()
+        bucket = LEDGER_BUCKETS[self.id & ((1 << LEDGER_BUCKET_BITS) - 1)][0]
+        line_id = (self.id >> LEDGER_BUCKET_BITS) & ((1 << LEDGER_LINE_BITS) - 1)
+        model_name = 'account.move.line' if bucket in LEDGER_MOVE_LINE_BUCKETS else 'account.analytic.line'
+        return bucket, self.env[model_name].browse(line_id)
+
+    def action_open_source(self):
+        """Open the journal entry or, for lines without one, the analytic line of a ledger row."""
+        bucket, line = self._get_ledger_source()
+        move = line.move_id if line._name == 'account.move.line' else line.move_line_id.move_id
+        if move:
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'account.move',
+                'res_id': move.id,
+                'view_mode': 'form',
+                'target': 'current',
+            }
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.analytic.line',
+            'res_id': line.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
@@ -0,0 +1,190 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectAnalyticsPeriod(models.Model):
+    _name = 'project.analytics.period'
+    _description = 'Project Analytics Period Figures'
+    _order = 'date_to desc, project_id'
+
+    project_id = fields.Many2one(
+        'project.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    company_id = fields.Many2one(related='project_id.company_id', store=True)
+    partner_id = fields.Many2one(related='project_id.partner_id', store=True)
+    user_id = fields.Many2one(related='project_id.user_id', store=True)
+    client_name = fields.Char(related='project_id.client_name', store=True)
+    head_of_project = fields.Char(related='project_id.head_of_project', store=True)
+
+    date_from = fields.Date(
+        string='From',
+        help="First day of the period. Empty means the figures include the complete history up to the as-of date."
+    )
+    date_to = fields.Date(
+        string='As of',
+        required=True,
+        help="Last day of the period (as-of date)."
+    )
+    is_closed = fields.Boolean(
+        string='Closed Period',
+        help="The period ended before the day it was computed. Figures of closed periods are cached and reused."
+    )
+
+    customer_invoiced_amount = fields.Float(string='Total Invoiced Amount', group_operator='sum')
+    customer_paid_amount = fields.Float(string='Total Paid Amount', group_operator='sum')
+    customer_outstanding_amount = fields.Float(string='Outstanding Amount', group_operator='sum')
+    vendor_bills_total = fields.Float(string='Vendor Bills Total', group_operator='sum')
+    customer_skonto_taken = fields.Float(string='Customer Cash Discounts (Skonto)', group_operator='sum')
+    vendor_skonto_received = fields.Float(string='Vendor Cash Discounts Received', group_operator='sum')
+    total_costs_net = fields.Float(string='Net Costs (without tax)', group_operator='sum')
+    total_costs_with_tax = fields.Float(string='Total Costs (with tax)', group_operator='sum')
+    profit_loss = fields.Float(string='Profit/Loss Amount', group_operator='sum')
+    negative_difference = fields.Float(string='Negative Differences (losses)', group_operator='sum')
+    total_hours_booked = fields.Float(string='Total Hours Booked', group_operator='sum')
+    labor_costs = fields.Float(string='Labor Costs', group_operator='sum')
+
+    def init(self):
+        cr = self.env.cr
+        # One row per project and period. date_from is empty in the main "as of"
+        # case and NULLs never conflict, hence the expression index instead of a
+        # unique constraint on the plain columns.
+        cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS project_analytics_period_key_uniq
+            ON project_analytics_period (project_id, COALESCE(date_from, '0001-01-01'::date), date_to)
+        """)
+        # Cache lookups are always scoped to one period
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS project_analytics_period_dates_index
+            ON project_analytics_period (date_to, date_from)
+        """)
+
+    @api.model
+    def _get_period_figures(self, projects, date_from, date_to, recompute=False):
+        """
+        Get the figures of the given projects for a period.
+
+        Figures of closed periods (ending before today) are computed on the
+        primary, cached and returned as they are. Figures of open periods are
+        recomputed on every call, on the read replica if one is configured.
+
+        Args:
+            projects: project.project recordset
+            date_from: first day of the period or False for the complete history
+            date_to: last day of the period ("as of")
+            recompute: compute the figures of a closed period again instead of
+                taking them from the cache
+
+        Returns:
+            project.analytics.period recordset
+        """
+        date_from = fields.Date.to_date(date_from) or False
+        date_to = fields.Date.to_date(date_to)
+        is_closed = date_to < fields.Date.context_today(self)
+        domain = [
+            ('project_id', 'in', projects.ids),
+            ('date_from', '=', date_from),
+            ('date_to', '=', date_to),
+        ]
+
+        periods = self.sudo().search(domain)
+        missing_projects = projects - periods.filtered('is_closed').project_id if is_closed and not recompute else projects
+        if missing_projects:
+            if is_closed:
+                # Closed rows are kept for good, they must include every line
+                # already booked on the primary (also in this transaction)
+                figures = missing_projects._compute_financial_figures(date_from, date_to)
+            else:
+                figures = missing_projects._read_financial_figures(date_from, date_to)
+            self._upsert_periods(missing_projects, date_from, date_to, is_closed, figures, overwrite=recompute)
+            periods = self.sudo().search(domain)
+            _logger.info(
+                f"Computed period figures ({date_from or '-'} - {date_to}) for {len(missing_projects)} project(s), "
+                f"{len(projects) - len(missing_projects)} taken from cache"
+            )
+
+        return periods.sudo(False)
+
+    @api.model
+    def _upsert_periods(self, projects, date_from, date_to, is_closed, figures, overwrite=False):
+        """
+        Store period figures with one INSERT ... ON CONFLICT.
+
+        Rows of closed periods are kept as they are unless overwrite is set,
+        rows of open periods are overwritten. Concurrent requests for the same period thus never create
+        duplicates or fail on the unique index; when the other transaction's row
+        is not visible yet, PostgreSQL raises a serialization failure and the
+        request is retried.
+        """
+        field_names = self.env['project.project']._get_financial_field_names()
+        projects.flush_recordset(['company_id', 'partner_id', 'user_id', 'client_name', 'head_of_project'])
+        self.flush_model()
+        columns = SQL(', ').join(SQL.identifier(name) for name in field_names)
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO project_analytics_period AS period
+                (project_id, company_id, partner_id, user_id, client_name, head_of_project,
+                 date_from, date_to, is_closed, %(columns)s, create_uid, write_uid, create_date, write_date)
+            SELECT project.id, project.company_id, project.partner_id, project.user_id, project.client_name,
+                   project.head_of_project, %(date_from)s::date, %(date_to)s::date, %(is_closed)s, %(figures)s,
+                   %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM (VALUES %(values)s) AS figures (project_id, %(columns)s)
+              JOIN project_project project ON project.id = figures.project_id
+          ORDER BY project.id
+            ON CONFLICT (project_id, COALESCE(date_from, '0001-01-01'::date), date_to)
+            DO UPDATE SET %(updates)s, is_closed = EXCLUDED.is_closed,
+                          write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+                    WHERE NOT period.is_closed OR %(overwrite)s
+            """,
+            columns=columns,
+            date_from=date_from or None,
+            date_to=date_to,
+            is_closed=is_closed,
+            overwrite=overwrite,
+            figures=SQL(', ').join(SQL("figures.%s", SQL.identifier(name)) for name in field_names),
+            uid=self.env.uid,
+            values=SQL(', ').join(
+                SQL("(%s, %s)", project.id, SQL(', ').join(
+                    SQL("%s::float", figures[project.id][name] or 0.0) for name in field_names
+                ))
+                for project in projects
+            ),
+            updates=SQL(', ').join(
+                SQL("%s = EXCLUDED.%s", SQL.identifier(name), SQL.identifier(name)) for name in field_names
+            ),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _invalidate_periods(self, projects, date_from=False, date_to=False):
+        """
+        Drop cached figures of periods that overlap the given dates, e.g. because
+        lines dated in closed periods were posted, changed or deleted.
+
+        Args:
+            date_from: earliest date of the changed lines
+            date_to: latest date of the changed lines
+            Without dates, all cached figures of the projects are dropped.
+        """
+        if not projects:
+            return
+        domain = [('project_id', 'in', projects.ids)]
+        if date_from:
+            domain.append(('date_to', '>=', date_from))
+        if date_to:
+            domain += ['|', ('date_from', '=', False), ('date_from', '<=', date_to)]
+        self.sudo().search(domain).unlink()
+
+    @api.autovacuum
+    def _gc_open_periods(self):
+        """Figures of open periods are never reused, drop them after a day."""
+        self.sudo().search([
+            ('is_closed', '=', False),
+            ('create_date', '<', fields.Datetime.subtract(fields.Datetime.now(), days=1)),
+        ]).unlink()
@@ -0,0 +1,99 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectAnalyticsRollup(models.Model):
+    _name = 'project.analytics.rollup'
+    _inherit = 'project.analytics.aggregate.mixin'
+    _description = 'Project Analytics Portfolio Rollup'
+    _order = 'level, company_id, profit_loss desc'
+    _aggregate_key_fields = ['level', 'partner_id', 'user_id', 'company_id']
+
+    level = fields.Selection(
+        [('client', 'Client'), ('manager', 'Project Manager'), ('company', 'Company')],
+        string='Level',
+        required=True,
+        readonly=True,
+    )
+    partner_id = fields.Many2one('res.partner', string='Client', readonly=True)
+    user_id = fields.Many2one('res.users', string='Project Manager', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    def init(self):
+        self._init_aggregate_index()
+        # Self-healing on every install/upgrade, one aggregate per level
+        self._rebuild_rollups()
+
+    @api.depends('level', 'partner_id', 'user_id', 'company_id')
+    def _compute_display_name(self):
+        for rollup in self:
+            if rollup.level == 'client':
+                rollup.display_name = rollup.partner_id.display_name or '-'
+            elif rollup.level == 'manager':
+                rollup.display_name = rollup.user_id.display_name or '-'
+            else:
+                rollup.display_name = rollup.company_id.display_name or '-'
+
+    @api.model
+    def _get_aggregate_keys(self, state):
+        """Client, project manager and company row of a project, none for archived projects."""
+        if not state or not state['active']:
+            return []
+        company_id = state['company_id']
+        return [
+            ('client', state['partner_id'], None, company_id),
+            ('manager', None, state['user_id'], company_id),
+            ('company', None, None, company_id),
+        ]
+
+    @api.model
+    def _rebuild_rollups(self):
+        """Rebuild all rollups from the stored project figures."""
+        field_names = self.env['project.project']._get_financial_field_names()
+        sums = SQL(', ').join(SQL("COALESCE(SUM(%s), 0)", SQL.identifier(name)) for name in field_names)
+        columns = SQL(', ').join(SQL.identifier(name) for name in field_names)
+
+        self.env['project.analytics.aggregate.delta']._discard_deltas(self._name)
+        self.env.cr.execute("DELETE FROM project_analytics_rollup")
+        for level, key_columns, group_by in (
+            ('client', SQL("partner_id, NULL::integer, company_id"), SQL("partner_id, company_id")),
+            ('manager', SQL("NULL::integer, user_id, company_id"), SQL("user_id, company_id")),
+            ('company', SQL("NULL::integer, NULL::integer, company_id"), SQL("company_id")),
+        ):
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO project_analytics_rollup
+                    (level, partner_id, user_id, company_id, project_count, %(columns)s,
+                     create_uid, write_uid, create_date, write_date)
+                SELECT %(level)s, %(key_columns)s, COUNT(*), %(sums)s,
+                       %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+                  FROM project_project
+                 WHERE active
+              GROUP BY %(group_by)s
+                """,
+                columns=columns, level=level, key_columns=key_columns, group_by=group_by,
+                sums=sums, uid=self.env.uid,
+            ))
+        self.invalidate_model()
+        _logger.info("Rebuilt project analytics rollups")
+
+    def action_rebuild_rollups(self):
+        if not self.env.user.has_group('project.group_project_manager'):
+            raise AccessError(_("Only project managers can rebuild the portfolio."))
+        self._rebuild_rollups()
+        self.env['project.analytics.summary']._rebuild_summaries()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Portfolio Rebuilt',
+                'message': 'The portfolio rollups and dashboard totals have been rebuilt from the project figures.',
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
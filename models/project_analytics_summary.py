@@ -0,0 +1,99 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Domains of project.project answered from the summary, by preset. They match the
+# unfiltered dashboard and its filter "Aktive Finanzdaten" (financial_active).
+SUMMARY_PRESET_DOMAINS = {
+    'all': [],
+    'unfrozen': [('financial_frozen', '=', False)],
+}
+
+
+class ProjectAnalyticsSummary(models.Model):
+    _name = 'project.analytics.summary'
+    _inherit = 'project.analytics.aggregate.mixin'
+    _description = 'Project Analytics Company Summary'
+    _order = 'company_id, preset'
+    _aggregate_key_fields = ['preset', 'company_id']
+
+    preset = fields.Selection(
+        [('all', 'All Projects'), ('unfrozen', 'Active Financial Data')],
+        string='Preset',
+        required=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    def init(self):
+        self._init_aggregate_index()
+        # Self-healing on every install/upgrade
+        self._rebuild_summaries()
+
+    @api.model
+    def _get_aggregate_keys(self, state):
+        """Rows of the presets a project matches, none for archived projects."""
+        if not state or not state['active']:
+            return []
+        keys = [('all', state['company_id'])]
+        if not state['financial_frozen']:
+            keys.append(('unfrozen', state['company_id']))
+        return keys
+
+    @api.model
+    def _rebuild_summaries(self):
+        """Rebuild all summaries from the stored project figures."""
+        field_names = self.env['project.project']._get_financial_field_names()
+        sums = SQL(', ').join(SQL("COALESCE(SUM(%s), 0)", SQL.identifier(name)) for name in field_names)
+        columns = SQL(', ').join(SQL.identifier(name) for name in field_names)
+
+        self.env['project.analytics.aggregate.delta']._discard_deltas(self._name)
+        self.env.cr.execute("DELETE FROM project_analytics_summary")
+        for preset, condition in (
+            ('all', SQL("TRUE")),
+            ('unfrozen', SQL("NOT COALESCE(financial_frozen, FALSE)")),
+        ):
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO project_analytics_summary
+                    (preset, company_id, project_count, %(columns)s,
+                     create_uid, write_uid, create_date, write_date)
+                SELECT %(preset)s, company_id, COUNT(*), %(sums)s,
+                       %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+                  FROM project_project
+                 WHERE active AND %(condition)s
+              GROUP BY company_id
+                """,
+                columns=columns, preset=preset, sums=sums, condition=condition, uid=self.env.uid,
+            ))
+        self.invalidate_model()
+        _logger.info("Rebuilt project analytics summaries")
+
+    @api.model
+    def _get_summary_totals(self, preset, companies, aggregates):
+        """
+        Totals of the projects of a preset in the given companies and of projects without company.
+
+        Args:
+            aggregates: '__count' or 'field:sum' specs as in _read_group
+        Returns:
+            tuple: one value per aggregate
+        """
+        columns = SQL(', ').join(
+            SQL("COALESCE(SUM(%s), 0)", SQL.identifier('project_count' if spec == '__count' else spec.split(':')[0]))
+            for spec in aggregates
+        )
+        self.env.cr.execute(SQL(
+            """
+            SELECT %s FROM project_analytics_summary
+             WHERE preset = %s AND (company_id = ANY(%s) OR company_id IS NULL)
+            """,
+            columns, preset, companies.ids,
+        ))
+        values = self.env.cr.fetchone()
+        return tuple(
+            int(value) if spec == '__count' else value
+            for spec, value in zip(aggregates, values)
+        )
@@ -0,0 +1,56 @@
+/** @odoo-module **/
+
+import { Domain } from "@web/core/domain";
+import { useService } from "@web/core/utils/hooks";
+import { useDebounced } from "@web/core/utils/timing";
+import { onWillDestroy, useEnv } from "@odoo/owl";
+
+// Must match FINANCIAL_BUS_NOTIFICATION in models/project_analytics.py. It is sent
+// on the company channels the server subscribes project users to (ir.websocket),
+// so the views do not add a channel of their own.
+export const FINANCIAL_BUS_NOTIFICATION = "project_statistic/updated";
+// Bursts of notifications (e.g. a chunked recompute) result in one reload
+const RELOAD_DELAY = 1000;
+
+/**
+ * Reload a view when the stored financial figures of projects change on the server.
+ *
+ * @param {(projectIds: number[], companyId: number|false) => boolean|Promise<boolean>} isAffected
+ *      whether the view shows one of the projects
+ * @param {() => Promise} reload reloads the data of the view
+ */
+export function useFinancialLiveUpdates(isAffected, reload) {
+    const busService = useService("bus_service");
+    const debouncedReload = useDebounced(reload, RELOAD_DELAY);
+    const onUpdate = async ({ company_id, project_ids }) => {
+        if (await isAffected(project_ids, company_id)) {
+            debouncedReload();
+        }
+    };
+    busService.subscribe(FINANCIAL_BUS_NOTIFICATION, onUpdate);
+    onWillDestroy(() => busService.unsubscribe(FINANCIAL_BUS_NOTIFICATION, onUpdate));
+}
+
+/**
+ * Reload an aggregating view (pivot, graph) through its search model when one of
+ * the changed projects is in an active company and matches the current search.
+ */
+export function useFinancialSearchUpdates() {
+    const env = useEnv();
+    const orm = useService("orm");
+    const companyService = useService("company");
+    useFinancialLiveUpdates(
+        async (projectIds, companyId) => {
+            if (companyId && !companyService.activeCompanyIds.includes(companyId)) {
+                return false;
+            }
+            // Archived projects count as well, archiving changes the totals
+            const domain = Domain.and([env.searchModel.domain, [["id", "in", projectIds]]]).toList();
+            const count = await orm.searchCount("project.project", domain, {
+                context: { active_test: false },
+            });
+            return count > 0;
+        },
+        () => env.searchModel.search()
+    );
+}
@@ -0,0 +1,70 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+import { listView } from "@web/views/list/list_view";
+import { ListController } from "@web/views/list/list_controller";
+import { pivotView } from "@web/views/pivot/pivot_view";
+import { PivotController } from "@web/views/pivot/pivot_controller";
+import { graphView } from "@web/views/graph/graph_view";
+import { GraphController } from "@web/views/graph/graph_controller";
+import { formView } from "@web/views/form/form_view";
+import { FormController } from "@web/views/form/form_controller";
+import { useFinancialLiveUpdates, useFinancialSearchUpdates } from "./project_statistic_live_updates";
+
+export class ProjectStatisticListController extends ListController {
+    setup() {
+        super.setup();
+        useFinancialLiveUpdates(
+            (projectIds) =>
+                this.model.root.isGrouped ||
+                this.model.root.records.some((record) => projectIds.includes(record.resId)),
+            () => this.model.root.load()
+        );
+    }
+}
+
+export class ProjectStatisticPivotController extends PivotController {
+    setup() {
+        super.setup();
+        // Aggregates may include any project of the search, reload through the search model
+        useFinancialSearchUpdates();
+    }
+}
+
+export class ProjectStatisticGraphController extends GraphController {
+    setup() {
+        super.setup();
+        useFinancialSearchUpdates();
+    }
+}
+
+export class ProjectStatisticFormController extends FormController {
+    setup() {
+        super.setup();
+        useFinancialLiveUpdates(
+            (projectIds) => projectIds.includes(this.model.root.resId),
+            async () => {
+                if (!this.model.root.dirty) {
+                    await this.model.root.load();
+                }
+            }
+        );
+    }
+}
+
+registry.category("views").add("project_statistic_list", {
+    ...listView,
+    Controller: ProjectStatisticListController,
+});
+registry.category("views").add("project_statistic_pivot", {
+    ...pivotView,
+    Controller: ProjectStatisticPivotController,
+});
+registry.category("views").add("project_statistic_graph", {
+    ...graphView,
+    Controller: ProjectStatisticGraphController,
+});
+registry.category("views").add("project_statistic_form", {
+    ...formView,
+    Controller: ProjectStatisticFormController,
+});
@@ -1 +1,3 @@
 from . import test_project_analytics
+from . import test_project_analytics_query_count
+from . import test_project_analytics_replica
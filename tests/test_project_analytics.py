@@ -1,3 +1,6 @@
+from unittest.mock import patch
+import json
+
 from odoo.tests.common import TransactionCase
 from odoo import fields
 
@@ -180,3 +183,499 @@ class TestProjectAnalytics(TransactionCase):
 
         expected_profit = self.project.customer_invoiced_amount - self.project.vendor_bills_total - self.project.total_costs_net
         self.assertAlmostEqual(self.project.profit_loss, expected_profit, places=2)
+
+    def test_07_period_figures_as_of_date(self):
+        """Test that the as-of date only includes lines up to that date"""
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+
+        yesterday = fields.Date.subtract(fields.Date.today(), days=1)
+        figures = self.project._compute_financial_figures(date_from=False, date_to=yesterday)
+        self.assertEqual(figures[self.project.id]['customer_invoiced_amount'], 0.0)
+
+        figures = self.project.with_context(financial_date_to=fields.Date.today())._compute_financial_figures()
+        self.assertGreater(figures[self.project.id]['customer_invoiced_amount'], 0.0)
+
+        # The stored fields always hold lifetime totals
+        self.project.with_context(financial_date_to=yesterday)._compute_financial_data()
+        self.assertGreater(self.project.customer_invoiced_amount, 0.0)
+
+    def test_08_period_figures_closed_period_cache(self):
+        """Test that closed periods are cached and invalidated by backdated lines"""
+        Period = self.env['project.analytics.period']
+        last_month = fields.Date.subtract(fields.Date.today(), months=1)
+
+        periods = Period._get_period_figures(self.project, False, last_month)
+        self.assertTrue(periods.is_closed)
+        self.assertEqual(Period._get_period_figures(self.project, False, last_month), periods)
+
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': last_month,
+            'date': last_month,
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Backdated Revenue',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+
+        self.assertFalse(periods.exists())
+        periods = Period._get_period_figures(self.project, False, last_month)
+        self.assertGreater(periods.customer_invoiced_amount, 0.0)
+
+    def test_09_streaming_export_csv(self):
+        """Test that the export streams one row per project in live and stored mode"""
+        other_project = self.Project.create({'name': 'Other Test Project'})
+        projects = self.project | other_project
+
+        for live in (False, True):
+            wizard = self.env['project.analytics.export.wizard'].create({
+                'file_format': 'csv',
+                'live': live,
+                'domain': repr([('id', 'in', projects.ids)]),
+            })
+            content = b''.join(wizard._generate_csv()).decode('utf-8')
+            lines = content.strip().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertIn('"Test Project"', content)
+            self.assertIn('"Other Test Project"', content)
+
+    def test_10_bi_page_keyset_pagination(self):
+        """Test keyset pagination and ETag of the BI dataset"""
+        other_project = self.Project.create({'name': 'Other Test Project'})
+        (self.project | other_project)._compute_financial_data()
+        self.env.flush_all()
+
+        after_id = min(self.project.id, other_project.id) - 1
+        page = self.Project._get_bi_page(after_id=after_id, limit=1)
+        self.assertEqual(len(page['items']), 1)
+        self.assertEqual(page['items'][0]['id'], min(self.project.id, other_project.id))
+        self.assertEqual(page['next_after_id'], page['items'][0]['id'])
+        self.assertIn('profit_loss', page['items'][0])
+        self.assertTrue(page['items'][0]['financial_data_computed_at'])
+
+        etag = self.Project._get_bi_etag(after_id, 1)
+        self.assertEqual(etag, self.Project._get_bi_etag(after_id, 1))
+        self.assertNotEqual(etag, self.Project._get_bi_etag(page['next_after_id'], 1))
+
+    def test_11_portfolio_rollup_incremental(self):
+        """Test that the client rollup follows project changes journaled before commit"""
+        Rollup = self.env['project.analytics.rollup']
+        Delta = self.env['project.analytics.aggregate.delta']
+
+        def commit():
+            # Journal the changes, then fold them like the cron does
+            self.env.cr.flush()
+            Delta._fold_deltas()
+
+        def client_rollup():
+            return Rollup.search([
+                ('level', '=', 'client'),
+                ('partner_id', '=', self.partner.id),
+                ('company_id', '=', self.project.company_id.id),
+            ])
+
+        self.project.partner_id = self.partner
+        self.env.cr.flush()
+        # Transactions only append to the journal
+        self.assertFalse(client_rollup())
+        self.assertTrue(Delta.search_count([('res_model', '=', 'project.analytics.rollup')]))
+        Delta._fold_deltas()
+        self.assertEqual(client_rollup().project_count, 1)
+        self.assertFalse(Delta.search_count([]))
+
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+        self.project._compute_financial_data()
+        commit()
+        self.assertGreater(self.project.customer_invoiced_amount, 0.0)
+        self.assertAlmostEqual(client_rollup().customer_invoiced_amount, self.project.customer_invoiced_amount, places=2)
+
+        self.project.active = False
+        commit()
+        self.assertFalse(client_rollup())
+
+    def test_12_frozen_closed_project(self):
+        """Test that closed projects are frozen, skipped by refreshes and thawed by new lines"""
+        closed_stage = self.env['project.project.stage'].create({
+            'name': 'Closed',
+            'fold': True,
+        })
+        self.project.stage_id = closed_stage
+        self.assertTrue(self.project.financial_frozen)
+
+        action = self.project.action_refresh_financial_data()
+        self.assertIn('1 frozen project(s) skipped', action['params']['message'])
+
+        self.AnalyticLine.create({
+            'name': 'Late Cost',
+            'account_id': self.analytic_account.id,
+            'amount': -10.0,
+        })
+        self.assertFalse(self.project.financial_frozen)
+
+    def test_13_chunked_line_scans(self):
+        """Test that chunked scans give the same figures as a single chunk"""
+        for amount in (-10.0, -20.0, -30.0):
+            self.AnalyticLine.create({
+                'name': 'Other Cost',
+                'account_id': self.analytic_account.id,
+                'amount': amount,
+            })
+
+        figures = self.project._compute_financial_figures(date_from=False, date_to=False)
+        with patch('odoo.addons.project_statistic.models.project_analytics.FINANCIAL_LINE_CHUNK_SIZE', 2):
+            chunked_figures = self.project._compute_financial_figures(date_from=False, date_to=False)
+
+        self.assertEqual(figures, chunked_figures)
+        self.assertAlmostEqual(chunked_figures[self.project.id]['total_costs_net'], 60.0, places=2)
+
+        # Only the scanned chunks are evicted, not other cached entries of the caller
+        invoice = self.Invoice.create({'move_type': 'out_invoice', 'partner_id': self.partner.id})
+        self.env.flush_all()
+        invoice.partner_id
+        with patch('odoo.addons.project_statistic.models.project_analytics.FINANCIAL_LINE_CHUNK_SIZE', 2):
+            self.project._compute_financial_figures(date_from=False, date_to=False)
+        self.assertTrue(self.env.cache.contains(invoice, invoice._fields['partner_id']))
+
+    def test_14_backfill_uncomputed_projects(self):
+        """Test that the backfill computes projects whose figures were never computed"""
+        self.AnalyticLine.create({
+            'name': 'Other Cost',
+            'account_id': self.analytic_account.id,
+            'amount': -25.0,
+        })
+        self.env.flush_all()
+        # Simulate columns created empty by _auto_init on install
+        self.env.cr.execute(
+            "UPDATE project_project SET financial_data_computed_at = NULL, total_costs_net = NULL WHERE id = %s",
+            [self.project.id],
+        )
+        self.project.invalidate_recordset()
+
+        self.Project._cron_backfill_financial_data()
+
+        self.assertTrue(self.project.financial_data_computed_at)
+        self.assertAlmostEqual(self.project.total_costs_net, 25.0, places=2)
+
+    def test_15_live_update_notification(self):
+        """Test that changed figures are pushed to the company of the projects in one notification per transaction"""
+        Bus = self.env['bus.bus']
+        other_project = self.Project.create({'name': 'Other Test Project'})
+        self.env.cr.flush()
+
+        last_id = Bus.search([], order='id desc', limit=1).id or 0
+        (self.project | other_project)._compute_financial_data()
+        self.env.cr.flush()
+
+        notifications = Bus.search([('id', '>', last_id), ('message', 'like', 'project_statistic/updated')])
+        self.assertEqual(len(notifications), 1)
+        company = self.project.company_id
+        self.assertEqual(json.loads(notifications.channel), [self.env.cr.dbname, 'res.company', company.id])
+        payload = json.loads(notifications.message)['payload']
+        self.assertEqual(payload['company_id'], company.id)
+        self.assertEqual(payload['project_ids'], sorted((self.project | other_project).ids))
+
+        # Project users only listen to the companies they may access
+        channels = self.env['ir.websocket'].with_user(self.env.ref('base.user_admin'))._build_bus_channel_list([])
+        self.assertIn(company, channels)
+
+    def test_16_labor_cost_revaluation(self):
+        """Test that timesheet hours are revalued at the rate valid on the day they were logged"""
+        employee = self.env['hr.employee'].create({
+            'name': 'Test Employee',
+            'hourly_cost': 50.0,
+        })
+        self.AnalyticLine.create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'account_id': self.analytic_account.id,
+            'employee_id': employee.id,
+            'unit_amount': 8.0,
+            'date': '2024-03-15',
+        })
+        self.project._compute_financial_data()
+        booked_labor_costs = self.project.labor_costs
+        profit_loss = self.project.profit_loss
+
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.labor_revaluation', 'True')
+        self.env['project.analytics.cost.rate'].create([
+            {'employee_id': employee.id, 'date_from': '2024-01-01', 'hourly_cost': 80.0},
+            {'employee_id': employee.id, 'date_from': '2024-04-01', 'hourly_cost': 100.0},
+        ])
+        self.Project._revalue_labor_costs()
+
+        self.assertAlmostEqual(self.project.labor_costs, 640.0, places=2)
+        self.assertAlmostEqual(self.project.profit_loss, profit_loss - (640.0 - booked_labor_costs), places=2)
+
+        # A regular recompute in revaluation mode gives the same figures
+        figures = self.project._compute_financial_figures(date_from=False, date_to=False)
+        self.assertAlmostEqual(figures[self.project.id]['labor_costs'], 640.0, places=2)
+        self.assertAlmostEqual(figures[self.project.id]['profit_loss'], self.project.profit_loss, places=2)
+
+    def test_17_ledger_adds_up_to_stored_figures(self):
+        """Test that the drill-down ledger of a project adds up to its stored figures"""
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 50},
+            })],
+        })
+        invoice.action_post()
+        self.AnalyticLine.create({
+            'name': 'Other Cost',
+            'account_id': self.analytic_account.id,
+            'amount': -120.0,
+        })
+        self.project._compute_financial_data()
+        self.env.flush_all()
+
+        totals = {
+            bucket: (amount, paid_amount)
+            for bucket, amount, paid_amount in self.env['project.analytics.ledger']._read_group(
+                [('project_id', '=', self.project.id)], ['bucket'], ['amount:sum', 'paid_amount:sum'],
+            )
+        }
+        self.assertAlmostEqual(totals['invoice'][0], self.project.customer_invoiced_amount, places=2)
+        self.assertAlmostEqual(totals['invoice'][1], self.project.customer_paid_amount, places=2)
+        self.assertAlmostEqual(totals['other_cost'][0], self.project.total_costs_net, places=2)
+
+        ledger_line = self.env['project.analytics.ledger'].search([
+            ('project_id', '=', self.project.id), ('bucket', '=', 'invoice'),
+        ], limit=1)
+        bucket, source = ledger_line._get_ledger_source()
+        self.assertEqual(bucket, 'invoice')
+        self.assertEqual(source.move_id, invoice)
+
+    def test_18_summary_answers_dashboard_totals(self):
+        """Test that the ungrouped dashboard totals come from the company summary and match the projects"""
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+        self.project._compute_financial_data()
+        self.env.cr.flush()
+        self.env['project.analytics.aggregate.delta']._fold_deltas()
+
+        Project = self.Project.with_user(self.env.ref('base.user_admin'))
+        aggregates = ['__count', 'customer_invoiced_amount:sum', 'profit_loss:sum']
+        for preset_domain in ([], [('financial_frozen', '=', False)]):
+            # Reads outside the dashboard action are never answered from the summary
+            self.assertFalse(Project._get_financial_summary_preset(preset_domain, (), aggregates))
+        Project = Project.with_context(project_statistic_summary=True)
+        for preset_domain in ([], [('financial_frozen', '=', False)]):
+            self.assertTrue(Project._get_financial_summary_preset(preset_domain, (), aggregates))
+            [summary_totals] = Project._read_group(preset_domain, [], aggregates)
+            # Not a preset domain, aggregated over the projects
+            [project_totals] = Project._read_group(preset_domain + [('id', '!=', 0)], [], aggregates)
+            self.assertEqual(summary_totals[0], project_totals[0])
+            for summary_total, project_total in zip(summary_totals[1:], project_totals[1:]):
+                self.assertAlmostEqual(summary_total, project_total, places=2)
+
+    def test_19_period_invalidation_by_date_range(self):
+        """Test that a batch of lines invalidates every cached period between its earliest and latest date"""
+        Period = self.env['project.analytics.period']
+        year = fields.Date.today().year - 1
+        periods = Period._get_period_figures(self.project, f'{year}-04-01', f'{year}-06-30')
+        self.assertTrue(periods.is_closed)
+
+        # Earliest line before, latest line within the period
+        self.AnalyticLine.create([{
+            'name': f'Cost {date}',
+            'account_id': self.analytic_account.id,
+            'amount': -10.0,
+            'date': date,
+        } for date in (f'{year}-01-15', f'{year}-05-15')])
+
+        self.assertFalse(periods.exists())
+        periods = Period._get_period_figures(self.project, f'{year}-04-01', f'{year}-06-30')
+        self.assertAlmostEqual(periods.total_costs_net, 10.0, places=2)
+
+    def test_20_period_figures_unique_per_period(self):
+        """Test that storing the figures of an as-of period twice keeps one row per project"""
+        Period = self.env['project.analytics.period']
+        for date_to in (fields.Date.subtract(fields.Date.today(), months=1), fields.Date.today()):
+            periods = Period._get_period_figures(self.project, False, date_to)
+            figures = self.project._compute_financial_figures(date_from=False, date_to=date_to)
+            # A concurrent request for the same period
+            Period._upsert_periods(self.project, False, date_to, periods.is_closed, figures)
+            self.assertEqual(Period.search_count([
+                ('project_id', '=', self.project.id), ('date_from', '=', False), ('date_to', '=', date_to),
+            ]), 1)
+            self.assertEqual(Period._get_period_figures(self.project, False, date_to).id, periods.id)
+
+    def test_21_ledger_and_periods_follow_project_visibility(self):
+        """Test that project users only see ledger lines and period figures of projects they can read"""
+        self.AnalyticLine.create({
+            'name': 'Other Cost',
+            'account_id': self.analytic_account.id,
+            'amount': -15.0,
+        })
+        self.env['project.analytics.period']._get_period_figures(self.project, False, fields.Date.today())
+        self.project.privacy_visibility = 'followers'
+        self.env.flush_all()
+
+        user = self.env['res.users'].create({
+            'name': 'Project User',
+            'login': 'project_statistic_user',
+            'groups_id': [(6, 0, [self.env.ref('project.group_project_user').id])],
+        })
+        domain = [('project_id', '=', self.project.id)]
+        for model_name in ('project.analytics.ledger', 'project.analytics.period'):
+            self.assertFalse(self.env[model_name].with_user(user).search(domain))
+
+        self.project.message_subscribe(partner_ids=user.partner_id.ids)
+        self.env.flush_all()
+        for model_name in ('project.analytics.ledger', 'project.analytics.period'):
+            self.assertTrue(self.env[model_name].with_user(user).search(domain))
+
+    def test_22_period_paid_amount_as_of_date(self):
+        """Test that the paid amount of a period only includes payments up to its as-of date"""
+        Period = self.env['project.analytics.period']
+        year = fields.Date.today().year - 1
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': f'{year}-03-01',
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+        period = Period._get_period_figures(self.project, False, f'{year}-06-30')
+        self.assertAlmostEqual(period.customer_paid_amount, 0.0, places=2)
+
+        # Paid within the period: the cached figures are dropped
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=invoice.ids,
+        ).create({'payment_date': f'{year}-05-15'})._create_payments()
+        self.assertFalse(period.exists())
+
+        period = Period._get_period_figures(self.project, False, f'{year}-06-30')
+        self.assertAlmostEqual(period.customer_paid_amount, invoice.amount_total, places=2)
+        self.assertAlmostEqual(period.customer_outstanding_amount, 0.0, places=2)
+        # Paid after the end of an earlier period
+        period = Period._get_period_figures(self.project, False, f'{year}-04-30')
+        self.assertAlmostEqual(period.customer_paid_amount, 0.0, places=2)
+        self.assertAlmostEqual(period.customer_outstanding_amount, invoice.amount_total, places=2)
+
+    def test_23_period_wizard_recompute(self):
+        """Test that the wizard recomputes a cached closed period on request"""
+        Period = self.env['project.analytics.period']
+        date_to = fields.Date.subtract(fields.Date.today(), months=1)
+        period = Period._get_period_figures(self.project, False, date_to)
+        period.total_costs_net = 99.0
+
+        wizard = self.env['project.analytics.period.wizard'].create({
+            'date_to': date_to,
+            'project_ids': [(6, 0, self.project.ids)],
+        })
+        wizard.action_open_period_figures()
+        self.assertAlmostEqual(period.total_costs_net, 99.0, places=2)
+
+        wizard.recompute = True
+        wizard.action_open_period_figures()
+        self.assertAlmostEqual(period.total_costs_net, 0.0, places=2)
+
+    def test_24_aggregates_restricted_to_project_managers(self):
+        """Test that only project managers read totals that include projects a project user cannot open"""
+        user = self.env['res.users'].create({
+            'name': 'Project User',
+            'login': 'project_statistic_aggregate_user',
+            'groups_id': [(6, 0, [self.env.ref('project.group_project_user').id])],
+        })
+        manager = self.env.ref('base.user_admin')
+        for model_name in ('project.analytics.rollup', 'project.analytics.summary'):
+            self.assertFalse(self.env[model_name].with_user(user).has_access('read'))
+            self.assertTrue(self.env[model_name].with_user(manager).has_access('read'))
+
+    def test_25_export_selected_projects(self):
+        """Test that the export takes the selected projects over the domain of the list"""
+        Wizard = self.env['project.analytics.export.wizard'].with_context(
+            active_model='project.project',
+            active_domain=[],
+        )
+        self.assertEqual(Wizard.with_context(active_ids=self.project.ids).create({}).domain,
+                         repr([('id', 'in', self.project.ids)]))
+        self.assertEqual(Wizard.with_context(active_ids=[]).create({}).domain, '[]')
+
+    def test_26_thaw_without_project_write_access(self):
+        """Test that booking a line thaws a frozen project also for users who cannot write it"""
+        self.project.stage_id = self.env['project.project.stage'].create({'name': 'Closed', 'fold': True})
+        self.assertTrue(self.project.financial_frozen)
+        user = self.env['res.users'].create({
+            'name': 'Timesheet Clerk',
+            'login': 'project_statistic_clerk',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        self.assertFalse(self.project.with_user(user).has_access('write'))
+
+        self.Project.with_user(user)._thaw_financial_data(self.analytic_account.ids)
+        self.assertFalse(self.project.financial_frozen)
+
+    def test_27_refresh_does_not_recompute_frozen_projects_twice(self):
+        """Test that projects frozen by a refresh are not recomputed a second time"""
+        self.project.stage_id = self.env['project.project.stage'].create({'name': 'Closed', 'fold': True})
+        self.project.financial_frozen = False
+        with patch.object(type(self.Project), '_compute_financial_figures', autospec=True,
+                          side_effect=type(self.Project)._compute_financial_figures) as compute:
+            self.project.action_refresh_financial_data()
+        self.assertTrue(self.project.financial_frozen)
+        self.assertEqual(compute.call_count, 1)
+
+    def test_28_cost_rate_table_cached_until_rates_change(self):
+        """Test that recomputes reuse the cost-rate table until a rate is changed"""
+        Rate = self.env['project.analytics.cost.rate']
+        employee = self.env['hr.employee'].create({'name': 'Test Employee'})
+        Rate._get_cost_rate_table()
+        with self.assertQueryCount(0):
+            Rate._get_cost_rate_table()
+
+        Rate.create({'employee_id': employee.id, 'date_from': '2024-01-01', 'hourly_cost': 80.0})
+        self.assertEqual(Rate._get_hourly_cost(Rate._get_cost_rate_table(), employee.id, fields.Date.to_date('2024-02-01')), 80.0)
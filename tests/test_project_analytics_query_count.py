@@ -0,0 +1,117 @@
+from odoo.tests.common import TransactionCase
+from odoo import fields
+
+# Queries a recompute may grow by between 1 and 100 projects (e.g. one extra
+# prefetch batch); anything proportional to the number of projects exceeds it
+QUERY_COUNT_BOUND = 5
+
+
+class TestProjectAnalyticsQueryCount(TransactionCase):
+    """Guard the compute paths against O(n) query regressions."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Project = cls.env['project.project']
+        cls.project_plan = cls.env.ref('analytic.analytic_plan_projects')
+        cls.account_field = 'analytic_account_id' if 'analytic_account_id' in cls.Project._fields else 'account_id'
+
+        cls.partner = cls.env['res.partner'].create({'name': 'Query Count Customer'})
+        cls.income_account = cls.env['account.account'].search([
+            ('account_type', '=', 'income')
+        ], limit=1)
+
+        cls.ledgers = {size: cls._create_projects_with_ledger(size) for size in (1, 10, 100)}
+
+    @classmethod
+    def _create_projects_with_ledger(cls, size):
+        """
+        Create projects with one posted invoice line and one cost line each.
+
+        Returns:
+            tuple: (projects, invoice lines distributed to the projects)
+        """
+        analytic_accounts = cls.env['account.analytic.account'].create([{
+            'name': f'Query Count Analytic {size}-{index}',
+            'plan_id': cls.project_plan.id,
+        } for index in range(size)])
+
+        projects = cls.Project.create([{
+            'name': f'Query Count Project {size}-{index}',
+            cls.account_field: analytic_account.id,
+        } for index, analytic_account in enumerate(analytic_accounts)])
+
+        invoice = cls.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': cls.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': f'Revenue {analytic_account.name}',
+                'quantity': 1,
+                'price_unit': 100.0,
+                'account_id': cls.income_account.id,
+                'analytic_distribution': {str(analytic_account.id): 100},
+            }) for analytic_account in analytic_accounts],
+        })
+        invoice.action_post()
+
+        cls.env['account.analytic.line'].create([{
+            'name': f'Cost {analytic_account.name}',
+            'account_id': analytic_account.id,
+            'amount': -10.0,
+        } for analytic_account in analytic_accounts])
+
+        invoice_lines = invoice.invoice_line_ids.filtered('analytic_distribution')
+        return projects, invoice_lines
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.cr.sql_log_count
+        func()
+        return self.cr.sql_log_count - start
+
+    def _assert_constant_query_count(self, func_by_size):
+        # Warm up ormcaches (xmlids, access rights) so that every size starts equal
+        func_by_size(1)()
+
+        counts = {size: self._count_queries(func_by_size(size)) for size in self.ledgers}
+        for size in (10, 100):
+            self.assertLessEqual(
+                counts[size], counts[1] + QUERY_COUNT_BOUND,
+                f"Query count grows with the number of projects: {counts}",
+            )
+
+    def test_01_compute_financial_data_query_count(self):
+        """Test that recomputing n projects takes a constant number of queries"""
+        def recompute(size):
+            projects = self.ledgers[size][0]
+            return lambda: projects._compute_financial_data()
+
+        self._assert_constant_query_count(recompute)
+
+        # The figures themselves must still be there
+        projects = self.ledgers[100][0]
+        self.assertEqual(len(projects.filtered(lambda project: project.customer_invoiced_amount > 0)), 100)
+        self.assertEqual(len(projects.filtered(lambda project: project.total_costs_net == 10.0)), 100)
+
+    def test_02_move_line_hook_query_count(self):
+        """Test that the move line hook resolves and recomputes n projects with constant queries"""
+        MoveLine = self.env['account.move.line']
+
+        def trigger(size):
+            invoice_lines = self.ledgers[size][1]
+            return lambda: MoveLine._trigger_project_analytics_recompute(invoice_lines)
+
+        self._assert_constant_query_count(trigger)
+
+    def test_03_period_figures_query_count(self):
+        """Test that period figures of n projects take a constant number of queries"""
+        Period = self.env['project.analytics.period']
+        date_to = fields.Date.today()
+
+        def period_figures(size):
+            projects = self.ledgers[size][0]
+            return lambda: Period._get_period_figures(projects, False, date_to)
+
+        self._assert_constant_query_count(period_figures)
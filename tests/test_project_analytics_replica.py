@@ -0,0 +1,85 @@
+from unittest.mock import patch
+from urllib.parse import quote
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+from odoo.tools import config
+
+
+class TestProjectAnalyticsReplica(TransactionCase):
+    """Route bulk reads to a second connection to the test database as replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Project = cls.env['project.project']
+        # Only committed projects are visible on the second connection
+        cls.projects = cls.Project.with_context(active_test=False).search([])
+
+    def _replica_uri(self):
+        """URI of the test database, an empty host connects through the local socket."""
+        credentials = quote(config['db_user'] or '', safe='')
+        if config['db_password']:
+            credentials += ':' + quote(config['db_password'], safe='')
+        location = config['db_host'] or ''
+        if location and config['db_port']:
+            location += f":{config['db_port']}"
+        return f"postgresql://{credentials}{'@' if credentials else ''}{location}/{quote(self.env.cr.dbname, safe='')}"
+
+    def _replica_config(self, **options):
+        return patch.dict(config.options, {
+            'project_statistic_replica_dsn': self._replica_uri(),
+            **{f'project_statistic_replica_{key}': value for key, value in options.items()},
+        })
+
+    def test_01_replica_matches_primary(self):
+        """Figures read on the replica are the figures of the primary for committed data."""
+        self.assertTrue(self.projects, "The test needs committed projects")
+        with self._replica_config():
+            with self.projects._financial_replica_env() as replica_env:
+                self.assertIsNotNone(replica_env)
+                self.assertIsNot(replica_env.cr, self.env.cr)
+            replica_figures = self.projects._read_financial_figures(date_from=False, date_to=False)
+        self.assertEqual(replica_figures, self.projects._compute_financial_figures(date_from=False, date_to=False))
+
+    def test_02_replica_lag_falls_back_to_primary(self):
+        """A replica lagging more than the maximum lag is not used."""
+        # No lag is ever below a negative maximum
+        with self._replica_config(max_lag=-1):
+            with self.assertLogs('odoo.addons.project_statistic.models.project_analytics', 'WARNING'):
+                with self.projects._financial_replica_env() as replica_env:
+                    self.assertIsNone(replica_env)
+            with self.assertLogs('odoo.addons.project_statistic.models.project_analytics', 'WARNING'):
+                figures = self.projects._read_financial_figures(date_from=False, date_to=False)
+        self.assertEqual(figures, self.projects._compute_financial_figures(date_from=False, date_to=False))
+
+    def test_03_unreachable_replica_falls_back_to_primary(self):
+        """An unreachable replica or a DSN that is not a URI falls back to the primary."""
+        expected = self.projects._compute_financial_figures(date_from=False, date_to=False)
+        for dsn in (f"postgresql://127.0.0.1:1/{self.env.cr.dbname}", f"dbname={self.env.cr.dbname}"):
+            with self.subTest(dsn=dsn), patch.dict(config.options, {'project_statistic_replica_dsn': dsn}):
+                with self.assertLogs('odoo.addons.project_statistic.models.project_analytics', 'WARNING'):
+                    with self.projects._financial_replica_env() as replica_env:
+                        self.assertIsNone(replica_env)
+                self.assertEqual(self.projects._read_financial_figures(date_from=False, date_to=False), expected)
+
+    def test_04_closed_periods_and_refresh_use_the_primary(self):
+        """Cached closed periods and stamped figures include lines the replica cannot see yet."""
+        plan = self.env.ref('analytic.analytic_plan_projects')
+        account = self.env['account.analytic.account'].create({'name': 'Replica Analytic', 'plan_id': plan.id})
+        account_field = 'analytic_account_id' if 'analytic_account_id' in self.Project._fields else 'account_id'
+        project = self.Project.create({'name': 'Replica Project', account_field: account.id})
+        year = fields.Date.today().year - 1
+        self.env['account.analytic.line'].create({
+            'name': 'Backdated Cost',
+            'account_id': account.id,
+            'amount': -100.0,
+            'date': f'{year}-03-15',
+        })
+
+        with self._replica_config():
+            period = self.env['project.analytics.period']._get_period_figures(project, False, f'{year}-12-31')
+            project._refresh_financial_data()
+        self.assertTrue(period.is_closed)
+        self.assertAlmostEqual(period.total_costs_net, 100.0, places=2)
+        self.assertAlmostEqual(project.total_costs_net, 100.0, places=2)
@@ -0,0 +1,2 @@
+from . import project_analytics_period_wizard
+from . import project_analytics_export_wizard
@@ -0,0 +1,151 @@
+from odoo import models, fields, api
+from odoo.tools import split_every
+from odoo.tools.safe_eval import safe_eval
+import csv
+import io
+import logging
+import tempfile
+
+import xlsxwriter
+
+_logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ProjectAnalyticsExportWizard(models.TransientModel):
+    _name = 'project.analytics.export.wizard'
+    _description = 'Project Analytics Export'
+
+    def _default_domain(self):
+        context = self.env.context
+        if context.get('active_model') == 'project.project':
+            # List header buttons always send the list's domain, the selection comes first
+            if context.get('active_ids'):
+                return repr([('id', 'in', context['active_ids'])])
+            if context.get('active_domain') is not None:
+                return repr(context['active_domain'])
+        return '[]'
+
+    file_format = fields.Selection(
+        [('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')],
+        string='Format',
+        required=True,
+        default='xlsx',
+    )
+    live = fields.Boolean(
+        string='Recompute Figures',
+        help="Recompute the figures from the analytic lines while exporting instead of exporting the stored values. "
+             "Slower, but independent of the last refresh."
+    )
+    domain = fields.Char(default=_default_domain, required=True)
+
+    def action_export(self):
+        """Start the download, the file is streamed by the export controller."""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/project_statistic/export/{self.id}',
+            'target': 'self',
+        }
+
+    def _get_export_field_names(self):
+        return ['client_name', 'name', 'head_of_project'] + self.env['project.project']._get_financial_field_names()
+
+    def _get_export_filename(self):
+        return f'Projektstatistik.{self.file_format}'
+
+    def _get_export_content_type(self):
+        if self.file_format == 'csv':
+            return 'text/csv;charset=utf-8'
+        return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    def _iter_export_chunks(self):
+        """
+        Read the projects in fixed-size chunks.
+
+        Only the ids of all matching projects are held in memory. Each chunk is
+        read (or recomputed in live mode), yielded and evicted from the cache
+        before the next one is loaded.
+
+        Yields:
+            list: rows (lists of values) of one chunk
+        """
+        Project = self.env['project.project']
+        live = self.live
+        field_names = self._get_export_field_names()
+        financial_field_names = Project._get_financial_field_names()
+        read_field_names = [name for name in field_names if not (live and name in financial_field_names)]
+
+        project_ids = Project.search(safe_eval(self.domain), order='id').ids
+        for chunk_ids in split_every(EXPORT_CHUNK_SIZE, project_ids):
+            projects = Project.browse(chunk_ids)
+            records = projects.read(read_field_names)
+            if live:
+                figures = projects._read_financial_figures(date_from=False, date_to=False)
+                for record in records:
+                    record.update(figures[record['id']])
+            yield [[record[name] for name in field_names] for record in records]
+            self.env.invalidate_all()
+
+        _logger.info(f"Exported project statistics for {len(project_ids)} project(s)")
+
+    def _get_export_header(self):
+        Project = self.env['project.project']
+        return [Project._fields[name].get_description(self.env)['string'] for name in self._get_export_field_names()]
+
+    def _generate_csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        writer.writerow(self._get_export_header())
+        for rows in self._iter_export_chunks():
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _generate_xlsx(self):
+        # constant_memory flushes every row to a temporary file once it is written
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+            worksheet = workbook.add_worksheet('Projektstatistik')
+            header_style = workbook.add_format({'bold': True})
+            worksheet.write_row(0, 0, self._get_export_header(), header_style)
+            row_index = 1
+            for rows in self._iter_export_chunks():
+                for row in rows:
+                    worksheet.write_row(row_index, 0, [value if value is not False else '' for value in row])
+                    row_index += 1
+            workbook.close()
+
+            output.seek(0)
+            while True:
+                data = output.read(65536)
+                if not data:
+                    break
+                yield data
+
+    def _stream_export(self):
+        """
+        Return a generator producing the export file.
+
+        The response body is generated after the request's cursor has been
+        closed, so the generator works on its own cursor.
+        """
+        self.ensure_one()
+        registry = self.env.registry
+        uid = self.env.uid
+        context = dict(self.env.context)
+        wizard_id = self.id
+
+        def generate():
+            with registry.cursor() as cr:
+                wizard = api.Environment(cr, uid, context)[self._name].browse(wizard_id)
+                if wizard.file_format == 'csv':
+                    yield from wizard._generate_csv()
+                else:
+                    yield from wizard._generate_xlsx()
+
+        return generate()
@@ -0,0 +1,71 @@
+from odoo import models, fields, _
+from odoo.tools import date_utils
+
+
+class ProjectAnalyticsPeriodWizard(models.TransientModel):
+    _name = 'project.analytics.period.wizard'
+    _description = 'Project Analytics Period Selection'
+
+    def _default_date_from(self):
+        return fields.Date.to_date(self.env.context.get('financial_date_from')) or False
+
+    def _default_date_to(self):
+        date_to = fields.Date.to_date(self.env.context.get('financial_date_to'))
+        if date_to:
+            return date_to
+        # Default to the end of the last closed quarter
+        today = fields.Date.context_today(self)
+        return date_utils.subtract(date_utils.start_of(today, 'quarter'), days=1)
+
+    def _default_project_ids(self):
+        if self.env.context.get('active_model') == 'project.project':
+            return [(6, 0, self.env.context.get('active_ids', []))]
+        return False
+
+    date_from = fields.Date(
+        string='From',
+        default=_default_date_from,
+        help="Leave empty to include the complete history up to the as-of date."
+    )
+    date_to = fields.Date(
+        string='As of',
+        required=True,
+        default=_default_date_to,
+    )
+    project_ids = fields.Many2many(
+        'project.project',
+        string='Projects',
+        default=_default_project_ids,
+        help="Leave empty to evaluate all projects."
+    )
+    recompute = fields.Boolean(
+        string='Recompute',
+        help="Compute the figures of a closed period again instead of taking them from the cache."
+    )
+
+    def action_open_period_figures(self):
+        """
+        Compute (or take from cache) the period figures and open them in the
+        list, pivot and graph views.
+        """
+        self.ensure_one()
+        projects = self.project_ids or self.env['project.project'].search([])
+        self.env['project.analytics.period']._get_period_figures(
+            projects, self.date_from, self.date_to, recompute=self.recompute,
+        )
+
+        domain = [('date_from', '=', self.date_from), ('date_to', '=', self.date_to)]
+        if self.project_ids:
+            domain.append(('project_id', 'in', self.project_ids.ids))
+
+        action = self.env['ir.actions.act_window']._for_xml_id('project_statistic.action_project_analytics_period')
+        if self.date_from:
+            action['name'] = _('Projektstatistik %(date_from)s - %(date_to)s', date_from=self.date_from, date_to=self.date_to)
+        else:
+            action['name'] = _('Projektstatistik zum %(date_to)s', date_to=self.date_to)
+        action['domain'] = domain
+        action['context'] = {
+            'financial_date_from': fields.Date.to_string(self.date_from),
+            'financial_date_to': fields.Date.to_string(self.date_to),
+        }
+        return action